@@ -1,109 +1,41 @@
-from fastapi import APIRouter
-from qdrant_client import QdrantClient
-from app.api.v1.schemas import RecommendRequest, BookResponse
-from app.services.explain import build_reasons
-from app.vector.embedding import embed_text
-from app.services.user_profile import (
-    build_user_taste_vector,
-    blend_vectors,
-)
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from fastapi import Depends
-router = APIRouter()
-
-qdrant = QdrantClient(url="http://localhost:6333")
 
-def genre_overlap_score(user_genres: list[str], book_genres: list[str]) -> float:
-    if not user_genres or not book_genres:
-        return 0.0
-    overlap = set(g.lower() for g in user_genres) & set(g.lower() for g in book_genres)
-    return len(overlap) / len(user_genres)
+from app.api.v1.schemas import RecommendBatchRequest, RecommendRequest, BookResponse
+from app.core.config import settings
+from app.core.timing import span
+from app.db.session import get_db
+from app.services.recommender import recommend_cached, recommend_many
 
+router = APIRouter()
 
-def page_score(preference: str | None, pages: int | None) -> float:
-    if not preference or not pages:
-        return 0.0
+_results = TypeAdapter(list[BookResponse])
+_batch_results = TypeAdapter(list[list[BookResponse]])
 
-    if preference == "Short (<300 pages)":
-        return 1.0 if pages < 300 else 0.0
-    if preference == "Medium (300-450 pages)":
-        return 1.0 if 300 <= pages <= 450 else 0.0
-    if preference == "Long (450+ pages)":
-        return 1.0 if pages > 450 else 0.0
 
-    return 0.0
+def _json(adapter: TypeAdapter, results) -> Response:
+    # Serialize here rather than in FastAPI's response handling, so it
+    # shows up as its own span
+    with span("serialization"):
+        return Response(adapter.dump_json(results), media_type="application/json")
 
 
 @router.post("/recommend", response_model=list[BookResponse])
-def recommend_books(payload: RecommendRequest,db: Session = Depends(get_db)):
-
-    query_text = " ".join(
-        payload.genres
-        + payload.vibes
-        + payload.themes
-        + [payload.pacePreference, payload.lengthPreference]
-    )
-
-    prompt_vector = embed_text(query_text)
-
-    taste_vector = build_user_taste_vector(
-        db=db,
-        user_id=payload.user_id,
-    )
-
-    vector = blend_vectors(
-        prompt_vector=prompt_vector,
-        taste_vector=taste_vector,
-    )
-    print("Taste vector exists:", taste_vector is not None)
-    
-    results = qdrant.search(
-        collection_name="books_clean",
-        query_vector=vector,
-        limit=payload.limit * 3,  # 🔑 over-fetch for re-ranking
-        with_payload=True,
-    )
-
-    ranked = []
-
-    for hit in results:
-        data = hit.payload or {}
-
-        v_score = hit.score
-        g_score = genre_overlap_score(payload.genres, data.get("genres", []))
-        p_score = page_score(payload.lengthPreference, data.get("pages"))
-
-        final_score = (
-            0.6 * v_score
-            + 0.25 * g_score
-            + 0.15 * p_score
+async def recommend_books(payload: RecommendRequest, db: Session = Depends(get_db)):
+    return _json(_results, await recommend_cached(db, payload))
+
+
+@router.post("/recommend/batch", response_model=list[list[BookResponse]])
+def recommend_books_batch(payload: RecommendBatchRequest, db: Session = Depends(get_db)):
+    """
+    Results for each request, in request order. CPU-bound, so it runs on
+    the threadpool rather than the event loop.
+    """
+    if len(payload.requests) > settings.RECOMMEND_BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.RECOMMEND_BATCH_MAX_REQUESTS} requests per batch",
         )
 
-        reasons = build_reasons(
-            vector_score=v_score,
-            genre_score=g_score,
-            page_score=p_score,
-            user_genres=payload.genres,
-            book_genres=data.get("genres", []),
-            used_taste_vector=taste_vector is not None,
-            pages=data.get("pages"),
-        )
-
-        ranked.append(
-            BookResponse(
-                id=data.get("id"),
-                title=data.get("title"),
-                author=data.get("author"),
-                description=data.get("description"),
-                genres=data.get("genres", []),
-                pages=data.get("pages"),
-                cover_url=data.get("cover_url"),
-                score=round(final_score, 4),
-                reasons=reasons,
-            )
-        )
-
-    ranked.sort(key=lambda x: x.score, reverse=True)
-
-    return ranked[: payload.limit]
+    return _json(_batch_results, recommend_many(db, payload.requests))
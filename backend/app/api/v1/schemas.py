@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 from uuid import UUID
 
@@ -17,6 +17,10 @@ class RecommendRequest(BaseModel):
     limit: int = 5
 
 
+class RecommendBatchRequest(BaseModel):
+    requests: List[RecommendRequest] = Field(..., min_length=1)
+
+
 class BookResponse(BaseModel):
     id: str
     title: str
@@ -33,3 +37,7 @@ class UserSignalRequest(BaseModel):
     user_id: UUID
     book_id: str
     signal: Literal["click", "like", "save"]
+
+
+class UserSignalBatchRequest(BaseModel):
+    events: List[UserSignalRequest] = Field(..., min_length=1)
@@ -1,24 +1,62 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import get_db
-from app.db.models.user_signal import UserSignal
-from app.api.v1.schemas import UserSignalRequest
+from app.api.v1.schemas import UserSignalBatchRequest, UserSignalRequest
+from app.services.response_cache import bump_signal_versions
+from app.services.signal_buffer import BufferFull, get_signal_buffer, write_signals
 
 router = APIRouter(prefix="/signals", tags=["signals"])
 
+
+def _store(db: Session, events: list[UserSignalRequest]) -> None:
+    rows = [
+        {"user_id": e.user_id, "book_id": e.book_id, "signal": e.signal}
+        for e in events
+    ]
+
+    if not settings.SIGNAL_BUFFERING:
+        write_signals(db, [{**row, "created_at": datetime.utcnow()} for row in rows])
+        db.commit()
+    else:
+        try:
+            get_signal_buffer().submit(rows)
+        except BufferFull:
+            # Backpressure: tell clients to retry rather than queue without bound
+            raise HTTPException(
+                status_code=503,
+                detail="Signal buffer full, retry later",
+                headers={"Retry-After": "1"},
+            )
+
+    # Cached recommendations for these users are now stale
+    bump_signal_versions({e.user_id for e in events})
+
+
 @router.post("/event")
 def record_signal(
     payload: UserSignalRequest,
     db: Session = Depends(get_db)
 ):
-    event = UserSignal(
-        user_id=payload.user_id,
-        book_id=payload.book_id,
-        signal=payload.signal,
-    )
-
-    db.add(event)
-    db.commit()
+    _store(db, [payload])
 
     return {"status": "ok"}
+
+
+@router.post("/batch")
+def record_signals(
+    payload: UserSignalBatchRequest,
+    db: Session = Depends(get_db)
+):
+    if len(payload.events) > settings.SIGNAL_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.SIGNAL_BATCH_MAX_EVENTS} events per batch",
+        )
+
+    _store(db, payload.events)
+
+    return {"status": "ok", "accepted": len(payload.events)}
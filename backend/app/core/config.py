@@ -3,6 +3,97 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql://localhost:5432/chapterverse"
     ENV: str = "dev"
+    # Log every SQL statement (slow; for local debugging only)
+    DB_ECHO: bool = False
+
+    # Store books.embedding as pgvector's vector type instead of float32
+    # bytea (needs the pgvector extension and Python package)
+    PGVECTOR: bool = False
+
+    # Vector store: "qdrant" | "numpy" (app.vector.backend)
+    VECTOR_BACKEND: str = "qdrant"
+    QDRANT_URL: str = "http://localhost:6333"
+    NUMPY_INDEX_PATH: str = "data/processed/numpy_index"
+    NUMPY_IVF_LISTS: int = 0  # 0 = exact search
+    NUMPY_IVF_NPROBE: int = 8
+
+    # Query embedding cache (app.vector.embedding)
+    EMBEDDING_CACHE_SIZE: int = 4096
+    EMBEDDING_CACHE_TTL_SECONDS: float | None = None
+
+    # On-disk book embedding cache for the indexing scripts
+    EMBEDDING_STORE_PATH: str = "data/embeddings.sqlite3"
+
+    # Query-time encoder: "torch" | "onnx" (int8, app.vector.onnx_encoder).
+    # Indexing always uses the torch model.
+    EMBEDDING_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = "data/models/all-MiniLM-L6-v2-onnx"
+    ONNX_THREADS: int = 0  # 0 = onnxruntime default
+
+    # Dedicated threads for model inference, kept off the shared threadpool
+    EMBEDDING_WORKERS: int = 2
+
+    # Cross-request micro-batching of query embeddings (app.vector.batcher)
+    EMBEDDING_BATCHING: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Prompt vectors: "facets" | "text" | "compare" (app.vector.facets)
+    QUERY_VECTOR_MODE: str = "facets"
+    FACET_EMBEDDINGS_PATH: str = "data/processed/facet_embeddings.npz"
+
+    # Book ID -> stored vector cache (app.vector.book_vectors)
+    BOOK_VECTOR_CACHE_SIZE: int = 50_000
+
+    # Catalog used to hydrate results (app.services.book_store)
+    BOOKS_DATA_PATH: str = "data/processed/books_clean.jsonl"
+    CORPUS_PATH: str = "data/processed/corpus"  # app.vector.corpus
+
+    # Re-ranking (app.services.scoring)
+    RERANK_OVERFETCH: int = 3
+    SEARCH_PREFILTER: bool = True
+    # Genre -> bit of the payload genre_mask, written by ingest_books
+    GENRE_VOCAB_PATH: str = "data/processed/genre_vocab.json"
+
+    # Exponential decay of old signals in the taste profile (None = off)
+    TASTE_DECAY_HALF_LIFE_DAYS: float | None = None
+
+    # POST /recommend/batch (app.services.recommender.recommend_many)
+    RECOMMEND_BATCH_MAX_REQUESTS: int = 1000
+
+    # Stored per-user results (app.scripts.precompute_recommendations)
+    PRECOMPUTED_RECOMMENDATIONS: bool = True
+    PRECOMPUTE_ACTIVE_DAYS: int = 30
+    PRECOMPUTED_TTL_SECONDS: float = 86_400.0
+    # Stamp rewritten by the indexing scripts (app.vector.catalog_version)
+    CATALOG_VERSION_PATH: str = "data/processed/catalog_version"
+
+    # /recommend response cache (app.services.response_cache)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_SIZE: int = 10_000
+    RESPONSE_CACHE_TTL_SECONDS: float | None = 300.0
+    RESPONSE_CACHE_VERSIONS_SIZE: int = 100_000  # users with tracked signal versions
+
+    # Write-behind buffer for user signals (app.services.signal_buffer)
+    SIGNAL_BUFFERING: bool = True
+    SIGNAL_BUFFER_MAX_SIZE: int = 10_000  # 503 beyond this many pending
+    SIGNAL_FLUSH_SIZE: int = 500
+    SIGNAL_FLUSH_INTERVAL_MS: float = 200.0
+    # A failed flush is retried with exponential backoff, then dropped
+    SIGNAL_FLUSH_MAX_RETRIES: int = 5
+    SIGNAL_FLUSH_RETRY_BACKOFF_MS: float = 200.0
+    SIGNAL_BATCH_MAX_EVENTS: int = 1000
+
+    # Raw signals older than this are rolled up (app.scripts.compact_signals)
+    SIGNAL_RETENTION_DAYS: int = 90
+
+    # Run startup warmup before serving instead of in the background
+    # (readiness is reported on /health either way)
+    WARMUP_BLOCKING: bool = False
+
+    # Per-stage spans on /recommend: Server-Timing header and the
+    # recommend_stage_seconds histogram on /metrics (app.core.timing)
+    SERVER_TIMING: bool = True
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,184 @@
+import bisect
+import threading
+from typing import Callable, Iterable, NamedTuple
+
+# Every histogram, in creation order, for /metrics
+REGISTRY: list["Histogram"] = []
+_registry_lock = threading.Lock()
+
+
+class Sample(NamedTuple):
+    name: str
+    kind: str  # "counter" | "gauge"
+    description: str
+    labels: dict
+    value: float
+
+
+# Functions read at scrape time, for values kept elsewhere (e.g. the
+# counters an LRUCache already maintains)
+COLLECTORS: list[Callable[[], Iterable[Sample]]] = []
+
+
+class Histogram:
+    """
+    Minimal thread-safe histogram with fixed upper bucket bounds.
+
+    Histograms sharing a name (one per label set) are rendered as one
+    Prometheus metric.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buckets: list[float],
+        description: str = "",
+        labels: dict[str, str] | None = None,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = sorted(buckets)
+        self.labels = labels or {}
+
+        self._counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+        with _registry_lock:
+            REGISTRY.append(self)
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets + [float("inf")], self._counts):
+                running += count
+                cumulative.append((bound, running))
+
+            return {
+                "buckets": cumulative,
+                "sum": self._sum,
+                "count": self._count,
+            }
+
+    def samples(self) -> list[str]:
+        """
+        Prometheus text-format sample lines.
+        """
+        snap = self.snapshot()
+        lines = []
+
+        for bound, count in snap["buckets"]:
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{self.name}_bucket{_labels({**self.labels, 'le': le})} {count}")
+
+        lines.append(f"{self.name}_sum{_labels(self.labels)} {snap['sum']}")
+        lines.append(f"{self.name}_count{_labels(self.labels)} {snap['count']}")
+        return lines
+
+
+class LabeledHistogram:
+    """
+    A Histogram per value of one label, created on first use.
+    """
+
+    def __init__(self, name: str, label: str, buckets: list[float], description: str = ""):
+        self.name = name
+        self.label = label
+        self.buckets = buckets
+        self.description = description
+
+        self._children: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value: str) -> Histogram:
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.get(value)
+                if child is None:
+                    child = Histogram(
+                        self.name,
+                        self.buckets,
+                        self.description,
+                        labels={self.label: value},
+                    )
+                    self._children[value] = child
+        return child
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def register_collector(collect: Callable[[], Iterable[Sample]]) -> None:
+    with _registry_lock:
+        COLLECTORS.append(collect)
+
+
+def register_cache(cache_name: str, cache) -> None:
+    """
+    Export an LRUCache's hit, miss and eviction counters and its size.
+    """
+    def collect():
+        stats = cache.stats()
+        labels = {"cache": cache_name}
+        return [
+            Sample("cache_hits_total", "counter", "Cache lookups that hit", labels, stats["hits"]),
+            Sample("cache_misses_total", "counter", "Cache lookups that missed", labels, stats["misses"]),
+            Sample("cache_evictions_total", "counter", "Entries evicted by size or TTL", labels, stats["evictions"]),
+            Sample("cache_size", "gauge", "Entries currently cached", labels, stats["size"]),
+        ]
+
+    register_collector(collect)
+
+
+def render_metrics() -> str:
+    """
+    Every registered histogram and collector in the Prometheus text
+    exposition format.
+    """
+    with _registry_lock:
+        histograms = list(REGISTRY)
+        collectors = list(COLLECTORS)
+
+    families: dict[str, list[Histogram]] = {}
+    for h in histograms:
+        families.setdefault(h.name, []).append(h)
+
+    lines = []
+    for name, members in families.items():
+        description = members[0].description
+        if description:
+            lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for h in members:
+            lines.extend(h.samples())
+
+    samples: dict[str, list[Sample]] = {}
+    for collect in collectors:
+        for sample in collect():
+            samples.setdefault(sample.name, []).append(sample)
+
+    for name, members in samples.items():
+        if members[0].description:
+            lines.append(f"# HELP {name} {members[0].description}")
+        lines.append(f"# TYPE {name} {members[0].kind}")
+        for sample in members:
+            lines.append(f"{name}{_labels(sample.labels)} {sample.value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,48 @@
+"""
+Process readiness, kept separate from liveness.
+
+/ping answers as soon as the process is up. /health answers 503 until
+the startup steps (schema, model warmup, lookup tables) have finished,
+so a load balancer only routes traffic to warm workers.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.error: str | None = None
+        self.timings: dict[str, float] = {}
+
+    def run(self, steps: list[tuple[str, callable]]) -> None:
+        try:
+            for name, step in steps:
+                started = time.perf_counter()
+                step()
+                self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+                logger.info("Startup step %s done in %.1f ms", name, self.timings[name])
+        except Exception as exc:
+            logger.exception("Startup failed")
+            self.error = repr(exc)
+            return
+
+        self.ready.set()
+
+    def start(self, steps: list[tuple[str, callable]]) -> threading.Thread:
+        thread = threading.Thread(target=self.run, args=(steps,), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready.is_set(),
+            "error": self.error,
+            "startup_ms": self.timings,
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,106 @@
+"""
+Per-request timing spans.
+
+The middleware opens a collection for each request; span() blocks inside
+it add their duration under a stage name, reported back in the
+Server-Timing header. Every span also feeds the recommend_stage_seconds
+histogram on /metrics, including spans outside a request (batch jobs).
+
+The collection lives in a contextvar: tasks spawned with asyncio.gather
+and calls sent through run_in_threadpool copy the context, so spans
+recorded there land on the request that started them.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, TypeVar
+
+from app.core.metrics import LabeledHistogram
+
+T = TypeVar("T")
+
+stage_histogram = LabeledHistogram(
+    "recommend_stage_seconds",
+    label="stage",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+    description="Time spent in each stage of the recommend path",
+)
+
+_spans: ContextVar[dict[str, float] | None] = ContextVar("timing_spans", default=None)
+
+
+def start_timing():
+    """
+    Begin collecting spans for the current context. Returns a token for
+    stop_timing().
+    """
+    return _spans.set({})
+
+
+def stop_timing(token) -> dict[str, float]:
+    spans = _spans.get() or {}
+    _spans.reset(token)
+    return spans
+
+
+def record(stage: str, seconds: float) -> None:
+    stage_histogram.labels(stage).observe(seconds)
+
+    spans = _spans.get()
+    if spans is not None:
+        # Repeated stages (e.g. relaxed searches) add up
+        spans[stage] = spans.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+async def timed(stage: str, awaitable: Awaitable[T]) -> T:
+    """
+    Await inside a span; for stages run concurrently with asyncio.gather.
+    """
+    with span(stage):
+        return await awaitable
+
+
+def server_timing(spans: dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in spans.items())
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware: collects spans for each HTTP request and adds them,
+    with the total, as a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_timing()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                spans = dict(_spans.get() or {})
+                if spans:
+                    spans["total"] = time.perf_counter() - started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(spans).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timing(token)
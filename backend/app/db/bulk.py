@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+
+UPSERT_CHUNK_SIZE = 1000
+
+
+def insert_for(dialect: str):
+    """
+    The dialect's INSERT construct with ON CONFLICT support, or None.
+    """
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def upsert_rows(db: Session, model, rows: list[dict], chunk_size: int = UPSERT_CHUNK_SIZE) -> None:
+    """
+    Insert rows, updating existing ones by primary key, with one
+    multi-row INSERT ... ON CONFLICT DO UPDATE per chunk. Does not commit.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    keys = [c.name for c in table.primary_key]
+    insert = insert_for(db.get_bind().dialect.name)
+
+    if insert is None:
+        for row in rows:
+            db.merge(model(**row))
+        return
+
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i : i + chunk_size]
+        stmt = insert(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in chunk[0] if name not in keys},
+        )
+        db.execute(stmt)
@@ -1,9 +1,11 @@
 from app.db.base import Base
 from app.db.session import engine
 from app.db.models.book import Book
+from app.db.models.user_signal import ensure_signal_index
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    ensure_signal_index(engine)
 
 if __name__ == "__main__":
     init_db()
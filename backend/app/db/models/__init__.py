@@ -1,3 +1,6 @@
 from app.db.models.user import User
 from app.db.models.preference import UserPreference
 from app.db.models.book import Book
+from app.db.models.user_signal import UserSignal, UserSignalAggregate
+from app.db.models.taste_profile import UserTasteProfile
+from app.db.models.precomputed import PrecomputedRecommendation
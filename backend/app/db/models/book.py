@@ -1,5 +1,8 @@
 from sqlalchemy import Column, String, Integer, Text
 from app.db.base import Base
+from app.db.types import Float32Vector
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
 
 class Book(Base):
     __tablename__ = "books"
@@ -15,5 +18,5 @@ class Book(Base):
 
     pages = Column(Integer, nullable=True)
 
-    # Vector stored as string (JSON-like)
-    embedding = Column(Text, nullable=True)
+    # float32 vector: bytea, or pgvector's vector type (app.db.types)
+    embedding = Column(Float32Vector(EMBEDDING_DIM), nullable=True)
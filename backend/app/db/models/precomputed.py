@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Integer, JSON, String
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.db.base import Base
+
+class PrecomputedRecommendation(Base):
+    """
+    A user's latest recommendations, for their latest request. Fresh
+    while request_key matches the request, profile_version matches the
+    user's taste profile version, catalog_version matches the indexed
+    catalog and computed_at is within PRECOMPUTED_TTL_SECONDS.
+    """
+    __tablename__ = "precomputed_recommendations"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    request_key = Column(String(64), nullable=False)
+    request = Column(JSON, nullable=False)
+
+    profile_version = Column(Integer, nullable=False, default=0)
+    catalog_version = Column(String(64), nullable=False, default="")
+    results = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Float, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.db.base import Base
+
+class UserTasteProfile(Base):
+    __tablename__ = "user_taste_profile"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    # Running weighted sum of book vectors (float32 bytes)
+    vector_sum = Column(LargeBinary, nullable=False)
+    total_weight = Column(Float, nullable=False, default=0.0)
+
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
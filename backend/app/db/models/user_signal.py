@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, DDL, DateTime, Float, Index, Integer, String, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -6,10 +6,61 @@ import uuid
 from app.db.base import Base
 
 class UserSignal(Base):
+    """
+    Raw signal events. On Postgres the table is range-partitioned by
+    month on created_at (partitions are created by
+    app.scripts.compact_signals); events older than the retention window
+    are rolled up into UserSignalAggregate.
+    """
     __tablename__ = "user_signals"
+    __table_args__ = (
+        # Taste queries: WHERE user_id = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_user_signals_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     user_id = Column(UUID(as_uuid=True), nullable=False)
     book_id = Column(String, nullable=False)
     signal = Column(String, nullable=False)  # click | like | save
-    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Catch-all partition, so inserts never fail for lack of a monthly one
+event.listen(
+    UserSignal.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS user_signals_default "
+        "PARTITION OF user_signals DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+# create_all only builds indexes together with a new table; a
+# user_signals table from before the index was declared gets it here
+# (a plain, unpartitioned table on existing databases)
+SIGNAL_INDEX_DDL = text(
+    "CREATE INDEX IF NOT EXISTS ix_user_signals_user_id_created_at "
+    "ON user_signals (user_id, created_at)"
+)
+
+
+def ensure_signal_index(bind) -> None:
+    with bind.begin() as conn:
+        conn.execute(SIGNAL_INDEX_DDL)
+
+
+class UserSignalAggregate(Base):
+    """
+    Compacted signal history: summed weight per user and book.
+    """
+    __tablename__ = "user_signal_aggregates"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    book_id = Column(String, primary_key=True)
+
+    weight = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+    last_signal_at = Column(DateTime, nullable=False)
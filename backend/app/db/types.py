@@ -0,0 +1,59 @@
+"""
+Column types shared by the models.
+"""
+import numpy as np
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+
+def _pgvector():
+    try:
+        from pgvector.sqlalchemy import Vector
+    except ImportError:
+        return None
+    return Vector
+
+
+class Float32Vector(TypeDecorator):
+    """
+    A float32 vector. Stored as raw little-endian bytes (bytea) and read
+    back with np.frombuffer, so decoding is zero-copy; or, on Postgres
+    with PGVECTOR enabled and the pgvector package installed, as a native
+    vector(dim) column. Either way values come back as np.ndarray.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def _native(self, dialect) -> bool:
+        return dialect.name == "postgresql" and settings.PGVECTOR and _pgvector() is not None
+
+    def load_dialect_impl(self, dialect):
+        if self._native(dialect):
+            return dialect.type_descriptor(_pgvector()(self.dim))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        vector = np.asarray(value, dtype="<f4")
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Expected a vector of size {self.dim}, got shape {vector.shape}")
+
+        if self._native(dialect):
+            return vector
+        return vector.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if self._native(dialect):
+            return np.asarray(value, dtype=np.float32)
+        return np.frombuffer(value, dtype="<f4")
@@ -1,17 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.core.readiness import readiness
+from app.core.timing import ServerTimingMiddleware
 from app.db.session import engine
 from app.db.base import Base
 from app.db import models
-
-Base.metadata.create_all(bind=engine)
+from app.db.models.user_signal import ensure_signal_index
+from app.vector.embedding import warmup
+from app.vector.facets import get_facet_table
+from app.services.book_store import get_book_store
+from app.services.signal_buffer import close_signal_buffer
 
 from fastapi.middleware.cors import CORSMiddleware
 
+
+def init_db():
+    Base.metadata.create_all(bind=engine)
+    ensure_signal_index(engine)
+
+
+# Everything slow happens here, after the worker is up, never at import
+STARTUP_STEPS = [
+    ("database", init_db),
+    ("model", warmup),
+    # Embed the questionnaire vocabulary once, before serving requests
+    ("facet_table", get_facet_table),
+    ("book_store", get_book_store),
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WARMUP_BLOCKING:
+        await run_in_threadpool(readiness.run, STARTUP_STEPS)
+    else:
+        readiness.start(STARTUP_STEPS)
+    yield
+    # Write out buffered signals before the worker exits
+    await run_in_threadpool(close_signal_buffer)
+
+
 app = FastAPI(
     title="Chapter & Verse API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -27,6 +66,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.SERVER_TIMING:
+    app.add_middleware(ServerTimingMiddleware)
+
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -37,7 +79,19 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    # Readiness: 503 until startup warmup has finished
+    status = readiness.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"ok": False, **status})
+    return {"ok": True, **status}
 @app.get("/ping")
 def ping():
-    return {"ping": "pong!"}
\ No newline at end of file
+    # Liveness: answers as soon as the process is up
+    return {"ping": "pong!"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
@@ -1,8 +1,9 @@
-from sentence_transformers import SentenceTransformer
+# The model lives in the shared registry in app.vector.embedding; this
+# module only re-exports it so there is one copy per process.
+from app.vector.embedding import MODEL_NAME, embed_text, get_model  # noqa: F401
 
-MODEL_NAME = "all-MiniLM-L6-v2"
 
-model = SentenceTransformer(MODEL_NAME)
-
-def embed_text(text: str) -> list[float]:
-    return model.encode(text).tolist()
+def __getattr__(name: str):
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
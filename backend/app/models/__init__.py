@@ -1 +0,0 @@
-from .user_book_signal import UserBookSignal
\ No newline at end of file
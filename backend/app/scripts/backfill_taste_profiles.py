@@ -0,0 +1,74 @@
+"""
+Rebuild user_taste_profile rows from the signal history: compacted
+aggregates first, then the raw user_signals.
+Run once after deploying the table, or to repair a drifted profile:
+
+    python -m app.scripts.backfill_taste_profiles
+"""
+from app.db.session import SessionLocal
+from app.db.models.user_signal import UserSignal, UserSignalAggregate
+from app.db.models.taste_profile import UserTasteProfile
+from app.services.taste_profile import apply_signals
+
+BATCH_SIZE = 1000
+
+
+def _apply_in_batches(db, rows, to_event, label: str) -> int:
+    batch = []
+    applied = 0
+
+    for row in rows:
+        batch.append(to_event(row))
+        if len(batch) == BATCH_SIZE:
+            apply_signals(db, batch)
+            db.flush()
+            applied += len(batch)
+            batch = []
+            print(f"Applied {applied} {label}")
+
+    if batch:
+        apply_signals(db, batch)
+        db.flush()
+        applied += len(batch)
+
+    return applied
+
+
+def run():
+    db = SessionLocal()
+
+    db.query(UserTasteProfile).delete()
+
+    # Each aggregate is folded in as one event at its latest signal time
+    aggregates = (
+        db.query(UserSignalAggregate)
+        .order_by(UserSignalAggregate.last_signal_at.asc())
+        .yield_per(BATCH_SIZE)
+    )
+    _apply_in_batches(db, aggregates, lambda a: {
+        "user_id": a.user_id,
+        "book_id": a.book_id,
+        "weight": a.weight,
+        "created_at": a.last_signal_at,
+    }, "aggregates")
+
+    signals = (
+        db.query(UserSignal)
+        .order_by(UserSignal.created_at.asc())
+        .yield_per(BATCH_SIZE)
+    )
+    _apply_in_batches(db, signals, lambda s: {
+        "user_id": s.user_id,
+        "book_id": s.book_id,
+        "signal": s.signal,
+        "created_at": s.created_at,
+    }, "signals")
+
+    db.commit()
+    db.close()
+
+    print("Backfill complete")
+
+
+if __name__ == "__main__":
+    run()
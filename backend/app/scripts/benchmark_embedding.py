@@ -0,0 +1,95 @@
+"""
+Parity and latency of the query-time embedding backends.
+
+Encodes random questionnaire prompts with each backend and reports
+cosine agreement against the torch model plus per-query latency:
+
+    python -m app.scripts.benchmark_embedding --samples 500
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.vector.embedding import load_model
+from app.vector.facets import GENRES, LENGTHS, PACES, THEMES, VIBES
+from app.vector.query_builder import build_query_text
+
+BACKENDS = ["torch", "onnx"]
+
+
+def sample_prompts(samples: int, seed: int = 0) -> list[str]:
+    rng = np.random.default_rng(seed)
+    prompts = []
+
+    for _ in range(samples):
+        prompts.append(build_query_text(
+            list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False)),
+            list(rng.choice(VIBES, size=rng.integers(1, 3), replace=False)),
+            list(rng.choice(THEMES, size=rng.integers(0, 3), replace=False)),
+            str(rng.choice(PACES)),
+            str(rng.choice(LENGTHS)),
+        ))
+
+    return prompts
+
+
+def time_queries(model, prompts: list[str], warmup: int = 10) -> tuple[np.ndarray, dict]:
+    """
+    Encode prompts one at a time, as the API does. Returns the vectors
+    and latency percentiles in ms.
+    """
+    for text in prompts[:warmup]:
+        model.encode(text)
+
+    vectors, timings = [], []
+    for text in prompts:
+        started = time.perf_counter()
+        vectors.append(model.encode(text))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings = np.array(timings)
+    return np.stack(vectors), {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "mean_ms": round(float(timings.mean()), 3),
+    }
+
+
+def run(samples: int = 500, backends: list[str] = BACKENDS) -> dict:
+    prompts = sample_prompts(samples)
+    results = {}
+    reference = None
+
+    for backend in backends:
+        vectors, latency = time_queries(load_model(backend), prompts)
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        results[backend] = latency
+
+        if reference is None:
+            reference = vectors
+            continue
+
+        cosines = (vectors * reference).sum(axis=1)
+        results[backend].update({
+            "cosine_mean": round(float(cosines.mean()), 5),
+            "cosine_min": round(float(cosines.min()), 5),
+            "cosine_p01": round(float(np.percentile(cosines, 1)), 5),
+            "speedup": round(results[backends[0]]["mean_ms"] / latency["mean_ms"], 2),
+        })
+
+    return {"samples": samples, "reference": backends[0], "backends": results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.samples, args.backends), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Maintenance for user_signals:
+
+  - adds the (user_id, created_at) index if the table predates it
+  - creates the monthly partitions for the coming months (Postgres)
+    ahead of time, while they are still empty
+  - rolls events older than the retention window up into
+    user_signal_aggregates (summed weight per user and book), then drops
+    whole expired partitions and deletes the remaining expired rows
+
+Run it daily, e.g. from cron:
+
+    python -m app.scripts.compact_signals --retention-days 90
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.bulk import insert_for
+from app.db.models.user_signal import SIGNAL_INDEX_DDL, UserSignal, UserSignalAggregate
+from app.db.session import SessionLocal
+from app.services.user_profile import SIGNAL_WEIGHTS
+
+
+# -----------------------------
+# Partitions
+# -----------------------------
+def month_start(day: datetime) -> datetime:
+    return datetime(day.year, day.month, 1)
+
+
+def add_months(day: datetime, months: int) -> datetime:
+    index = day.year * 12 + day.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"user_signals_{month:%Y%m}"
+
+
+def ensure_partitions(db: Session, months_ahead: int, now: datetime) -> list[str]:
+    """
+    Create monthly partitions for the next months_ahead months. The
+    current month is never created: its rows are already arriving in
+    the default partition, and Postgres refuses a new partition whose
+    range the default partition already holds rows for. Past months and
+    the month the table was created in stay in the default partition.
+    """
+    created = []
+    start = month_start(now)
+
+    for i in range(1, months_ahead + 1):
+        month = add_months(start, i)
+        name = partition_name(month)
+
+        # One bad month (e.g. early rows from a skewed clock already in
+        # the default partition) must not abort the others or compaction
+        try:
+            with db.begin_nested():
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF user_signals "
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                ))
+        except DBAPIError as exc:
+            print(f"Skipped partition {name}: {exc.orig}")
+            continue
+
+        created.append(name)
+
+    return created
+
+
+def expired_partitions(db: Session, cutoff: datetime) -> list[str]:
+    """
+    Monthly partitions whose whole range is older than cutoff.
+    """
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'user_signals'"
+    )).scalars()
+
+    expired = []
+    for name in names:
+        try:
+            month = datetime.strptime(name.rsplit("_", 1)[-1], "%Y%m")
+        except ValueError:
+            continue  # the default partition
+        if add_months(month, 1) <= cutoff:
+            expired.append(name)
+
+    return sorted(expired)
+
+
+# -----------------------------
+# Compaction
+# -----------------------------
+def compact(db: Session, cutoff: datetime) -> int:
+    """
+    Add every event older than cutoff to user_signal_aggregates and
+    remove it from user_signals, in the caller's transaction.
+    Returns the number of aggregate rows written.
+    """
+    weight = case(SIGNAL_WEIGHTS, value=UserSignal.signal, else_=0.1)
+
+    rollup = (
+        select(
+            UserSignal.user_id,
+            UserSignal.book_id,
+            func.sum(weight),
+            func.count(),
+            func.max(UserSignal.created_at),
+        )
+        .where(UserSignal.created_at < cutoff)
+        .group_by(UserSignal.user_id, UserSignal.book_id)
+    )
+
+    dialect = db.get_bind().dialect.name
+    insert = insert_for(dialect)
+    table = UserSignalAggregate.__table__
+
+    stmt = insert(table).from_select(
+        ["user_id", "book_id", "weight", "count", "last_signal_at"],
+        rollup,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "book_id"],
+        set_={
+            "weight": table.c.weight + stmt.excluded.weight,
+            "count": table.c.count + stmt.excluded.count,
+            # Earlier runs only rolled up older events
+            "last_signal_at": stmt.excluded.last_signal_at,
+        },
+    )
+    written = db.execute(stmt).rowcount
+
+    if dialect == "postgresql":
+        # Whole expired months go with a cheap DROP instead of a DELETE
+        for name in expired_partitions(db, cutoff):
+            db.execute(text(f"DROP TABLE {name}"))
+
+    db.execute(delete(UserSignal).where(UserSignal.created_at < cutoff))
+    return written
+
+
+def run(retention_days: int, months_ahead: int, partitions_only: bool = False) -> None:
+    db = SessionLocal()
+    now = datetime.utcnow()
+
+    try:
+        # Databases created before the index was declared
+        db.execute(SIGNAL_INDEX_DDL)
+        db.commit()
+
+        if db.get_bind().dialect.name == "postgresql":
+            names = ensure_partitions(db, months_ahead, now)
+            db.commit()
+            print(f"Partitions ready: {', '.join(names)}")
+
+        if not partitions_only:
+            cutoff = now - timedelta(days=retention_days)
+            written = compact(db, cutoff)
+            print(f"Compacted signals before {cutoff:%Y-%m-%d} into {written} aggregates")
+
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--retention-days", type=int, default=settings.SIGNAL_RETENTION_DAYS)
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--partitions-only", action="store_true")
+    args = parser.parse_args()
+
+    run(args.retention_days, args.months_ahead, args.partitions_only)
+
+
+if __name__ == "__main__":
+    main()
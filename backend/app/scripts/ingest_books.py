@@ -1,112 +1,274 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
-from pathlib import Path
+"""
+Stream the processed catalog into the vector store.
+
+    read -> build text -> encode chunk -> upsert
+
+Stages are connected by bounded queues, so memory stays flat with
+catalog size and encoding of chunk N+1 overlaps the upsert of chunk N.
+Progress is checkpointed; an interrupted run resumes where it stopped
+unless --restart is given.
+
+Vectors come from the shared embedding store, so unchanged books are
+never re-encoded; --changed-only also skips upserting them. With
+--workers > 1 encoding runs on a multi-process pool.
+"""
+import argparse
 import json
+import os
+import queue
+import threading
+from itertools import islice
+from pathlib import Path
 
-from app.vector.embedding import model
+from app.core.config import settings
+from app.services.scoring import GenreVocab
+from app.utils.corpus import iter_books
+from app.vector.backend import get_vector_backend
+from app.vector.bulk import BulkEncoder
+from app.vector.catalog_version import bump_catalog_version
+from app.vector.embedding import MODEL_NAME
+from app.vector.embedding_store import content_hash, encode_with_store, get_embedding_store
 
 # -----------------------------
 # Config
 # -----------------------------
-QDRANT_URL = "http://localhost:6333"
 COLLECTION_NAME = "books_clean"
 VECTOR_SIZE = 384          # all-MiniLM-L6-v2
-BATCH_SIZE = 128
+BATCH_SIZE = 128           # books per chunk, per worker
+ENCODE_BATCH_SIZE = 64
+QUEUE_DEPTH = 2            # chunks buffered between stages
+CHECKPOINT_EVERY = 10      # chunks between checkpoints (at least)
+TEXT_BUILDER_VERSION = "ingest-v1"  # bump when build_text changes
 
-DATA_PATH = Path("data/processed/books_clean.json")
+DATA_PATH = Path("data/processed/books_clean.jsonl")
+CHECKPOINT_PATH = Path("data/processed/.ingest_checkpoint.json")
 
-# -----------------------------
-# Load books
-# -----------------------------
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    books = json.load(f)
+_DONE = object()
 
-print(f"Loaded {len(books)} books")
 
 # -----------------------------
 # Build texts + payloads
 # -----------------------------
-texts = []
-payloads = []
-
-for book in books:
-    text = (
+def build_text(book: dict) -> str:
+    return (
         f"{book['title']} "
         f"{book['author']} "
         f"{' '.join(book.get('genres', []))} "
         f"{book.get('description', '')}"
     )
 
-    texts.append(text)
 
-    payloads.append({
+def build_payload(book: dict, vocab: GenreVocab) -> dict:
+    return {
         "id": book["id"],
         "title": book["title"],
         "author": book["author"],
         "description": book.get("description"),
         "genres": book.get("genres", []),
+        "genre_mask": vocab.mask(book.get("genres", [])),
         "pages": book.get("pages"),
         "cover_url": book.get("cover_url"),
-    })
+    }
 
-# -----------------------------
-# Connect to Qdrant
-# -----------------------------
-client = QdrantClient(url=QDRANT_URL)
 
-# -----------------------------
-# Create collection (if needed)
-# -----------------------------
-existing = [c.name for c in client.get_collections().collections]
-
-if COLLECTION_NAME not in existing:
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(
-            size=VECTOR_SIZE,
-            distance=Distance.COSINE,
-        ),
-    )
-    print(f"Collection created: {COLLECTION_NAME}")
-else:
-    print(f"Collection already exists: {COLLECTION_NAME}")
+def update_genre_vocab(source: Path) -> GenreVocab:
+    """
+    Add the catalog's new genres to the stored vocabulary, before any
+    payload uses their bits. Existing bits never move.
+    """
+    path = Path(settings.GENRE_VOCAB_PATH)
+    vocab = GenreVocab.load(path)
+
+    added = vocab.extend(g for book in iter_books(source) for g in book.get("genres") or [])
+    if added or not path.exists():
+        vocab.save(path)
+        print(f"Genre vocabulary: {len(vocab.genres)} genres ({added} new)")
+
+    return vocab
 
-# -----------------------------
-# 🔥 Embed ONCE (IMPORTANT)
-# -----------------------------
-print("Embedding books...")
-vectors = model.encode(
-    texts,
-    batch_size=64,
-    show_progress_bar=True,
-)
 
 # -----------------------------
-# Build points
+# Checkpoint
 # -----------------------------
-points = [
-    PointStruct(
-        id=i,
-        vector=vectors[i],
-        payload=payloads[i],
+def load_checkpoint(source: Path) -> int:
+    if not CHECKPOINT_PATH.exists():
+        return 0
+
+    state = json.loads(CHECKPOINT_PATH.read_text(encoding="utf-8"))
+    if state.get("source") != str(source) or state.get("collection") != COLLECTION_NAME:
+        return 0
+
+    return state.get("done", 0)
+
+
+def save_checkpoint(source: Path, done: int) -> None:
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHECKPOINT_PATH.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"source": str(source), "collection": COLLECTION_NAME, "done": done}),
+        encoding="utf-8",
     )
-    for i in range(len(vectors))
-]
+    tmp.replace(CHECKPOINT_PATH)
+
 
 # -----------------------------
-# Upload in batches
+# Stages
 # -----------------------------
-print("Uploading to Qdrant...")
+def read_chunks(source: Path, start: int, batch_size: int):
+    books = islice(iter_books(source), start, None)
+
+    while True:
+        chunk = list(islice(books, batch_size))
+        if not chunk:
+            return
+        yield chunk
+
 
-for i in range(0, len(points), BATCH_SIZE):
-    batch = points[i : i + BATCH_SIZE]
+def _reader(source: Path, start: int, batch_size: int, out: queue.Queue, errors: list):
+    try:
+        for chunk in read_chunks(source, start, batch_size):
+            out.put([(build_text(b), b) for b in chunk])
+    except Exception as exc:
+        errors.append(exc)
+    finally:
+        out.put(_DONE)
 
-    client.upsert(
-        collection_name=COLLECTION_NAME,
-        points=batch,
-        wait=True,
+
+def _uploader(backend, source: Path, start: int, inp: queue.Queue, errors: list):
+    done = start
+    chunks = 0
+    next_checkpoint = CHECKPOINT_EVERY
+
+    try:
+        while True:
+            item = inp.get()
+            if item is _DONE:
+                break
+
+            points, hashes, size = item
+            if points:
+                backend.upsert(points)
+                get_embedding_store().mark_indexed(COLLECTION_NAME, hashes)
+            done += size
+            chunks += 1
+            print(f"Uploaded {done} books")
+
+            if chunks >= next_checkpoint:
+                backend.flush()
+                save_checkpoint(source, done)
+
+                # A flush that rewrites the whole index gets spaced out
+                # geometrically, so all of them together cost O(catalog)
+                step = max(CHECKPOINT_EVERY, chunks) if backend.rewrites_on_flush else CHECKPOINT_EVERY
+                next_checkpoint = chunks + step
+
+        backend.flush()
+        save_checkpoint(source, done)
+    except Exception as exc:
+        errors.append(exc)
+        # Keep draining so the encoder never blocks on a dead consumer
+        while inp.get() is not _DONE:
+            pass
+
+
+def ingest(
+    source: Path = DATA_PATH,
+    batch_size: int = BATCH_SIZE,
+    restart: bool = False,
+    changed_only: bool = False,
+    workers: int = 1,
+) -> int:
+    backend = get_vector_backend(COLLECTION_NAME)
+    backend.ensure_collection(VECTOR_SIZE)
+
+    # Indexed so length and genre preferences can be pushed into the search
+    backend.ensure_payload_index("pages", "integer")
+    backend.ensure_payload_index("genres", "keyword")
+    print(f"Collection ready: {COLLECTION_NAME}")
+
+    vocab = update_genre_vocab(source)
+
+    start = 0 if restart else load_checkpoint(source)
+    if start:
+        print(f"Resuming after {start} books")
+
+    texts_q: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+    points_q: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+    errors: list = []
+
+    reader = threading.Thread(
+        target=_reader, args=(source, start, batch_size, texts_q, errors), daemon=True
+    )
+    uploader = threading.Thread(
+        target=_uploader, args=(backend, source, start, points_q, errors), daemon=True
     )
+    reader.start()
+    uploader.start()
+
+    store = get_embedding_store()
+    processed = 0
+    upserted = 0
+    with BulkEncoder(workers, batch_size=ENCODE_BATCH_SIZE) as bulk:
+        try:
+            while True:
+                chunk = texts_q.get()
+                if chunk is _DONE or errors:
+                    break
+
+                payloads = [build_payload(book, vocab) for _, book in chunk]
+                hashes = [
+                    (payload["id"], content_hash(text, payload))
+                    for (text, _), payload in zip(chunk, payloads)
+                ]
+
+                keep = range(len(chunk))
+                if changed_only:
+                    changed = store.changed(COLLECTION_NAME, hashes)
+                    keep = [i for i, (book_id, _) in enumerate(hashes) if book_id in changed]
+
+                vectors = encode_with_store(
+                    [chunk[i][0] for i in keep],
+                    TEXT_BUILDER_VERSION,
+                    encode=bulk.encode,
+                    model_name=MODEL_NAME,
+                )
+                points = [
+                    (payloads[i]["id"], vector, payloads[i])
+                    for i, vector in zip(keep, vectors)
+                ]
+
+                points_q.put((points, [hashes[i] for i in keep], len(chunk)))
+                processed += len(chunk)
+                upserted += len(points)
+        finally:
+            points_q.put(_DONE)
+            uploader.join()
+
+    if errors:
+        raise errors[0]
+
+    CHECKPOINT_PATH.unlink(missing_ok=True)
+    if upserted:
+        # Results derived from the old catalog are now stale
+        bump_catalog_version()
+    print(bulk.report())
+    print(f"Upserted {upserted} of {processed} books")
+    return start + processed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", type=Path, default=DATA_PATH)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint")
+    parser.add_argument("--changed-only", action="store_true", help="skip unchanged books")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    batch_size = args.batch_size or BATCH_SIZE * args.workers
+    total = ingest(args.path, batch_size, args.restart, args.changed_only, args.workers)
+    print(f"Ingestion complete 🚀 ({total} books)")
 
-    print(f"Uploaded {min(i + BATCH_SIZE, len(points))} / {len(points)}")
 
-print("Ingestion complete 🚀")
+if __name__ == "__main__":
+    main()
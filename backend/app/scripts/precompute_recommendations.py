@@ -0,0 +1,104 @@
+"""
+Refresh precomputed_recommendations for active users.
+
+Walks users with signals in the last --active-days, and for every one
+whose stored row is stale (older than their taste profile, computed
+against another catalog version, or past PRECOMPUTED_TTL_SECONDS),
+recomputes their latest request with the online blend and re-rank (in
+batches through recommend_many) and stamps the row with the current
+profile and catalog versions.
+Run it ahead of peak hours:
+
+    python -m app.scripts.precompute_recommendations --active-days 30
+"""
+import argparse
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import or_, select
+
+from app.api.v1.schemas import RecommendRequest
+from app.core.config import settings
+from app.db.bulk import upsert_rows
+from app.db.models.precomputed import PrecomputedRecommendation
+from app.db.models.taste_profile import UserTasteProfile
+from app.db.models.user_signal import UserSignal
+from app.db.session import SessionLocal
+from app.services.precomputed import fresh_after, precomputed_row
+from app.services.recommender import recommend_many
+from app.vector.catalog_version import catalog_version
+
+BATCH_SIZE = 256
+
+
+def stale_rows(db, since: datetime, catalog: str, computed_after: datetime):
+    """
+    (stored request, current profile version) for active users whose
+    stored results predate their latest profile version, were computed
+    against another catalog or before computed_after.
+    """
+    active = (
+        select(UserSignal.user_id)
+        .where(UserSignal.created_at >= since)
+        .distinct()
+        .subquery()
+    )
+
+    return db.execute(
+        select(PrecomputedRecommendation.request, UserTasteProfile.version)
+        .join(UserTasteProfile, UserTasteProfile.user_id == PrecomputedRecommendation.user_id)
+        .join(active, active.c.user_id == PrecomputedRecommendation.user_id)
+        .where(or_(
+            PrecomputedRecommendation.profile_version != UserTasteProfile.version,
+            PrecomputedRecommendation.catalog_version != catalog,
+            PrecomputedRecommendation.computed_at < computed_after,
+        ))
+    ).all()
+
+
+def run(active_days: int, batch_size: int = BATCH_SIZE) -> int:
+    db = SessionLocal()
+    now = datetime.utcnow()
+    since = now - timedelta(days=active_days)
+    catalog = catalog_version()
+    refreshed = 0
+
+    try:
+        # Rows about to expire are refreshed too, ahead of the next run
+        rows = iter(stale_rows(db, since, catalog, fresh_after(now) + timedelta(days=1)))
+        print("Refreshing stale precomputed recommendations")
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            payloads = [RecommendRequest(**request) for request, _ in batch]
+            results = recommend_many(db, payloads)
+
+            upsert_rows(db, PrecomputedRecommendation, [
+                precomputed_row(payload, result, version, catalog)
+                for payload, result, (_, version) in zip(payloads, results, batch)
+            ])
+            db.commit()
+
+            refreshed += len(batch)
+            print(f"Refreshed {refreshed} users")
+    finally:
+        db.close()
+
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--active-days", type=int, default=settings.PRECOMPUTE_ACTIVE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    total = run(args.active_days, args.batch_size)
+    print(f"Precompute complete ({total} users)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
-import pandas as pd
-import json
-import re
-from itertools import cycle
+"""
+Clean the raw Google Books CSV into the catalog corpus.
+
+The CSV is read in chunks and each chunk is cleaned with vectorized
+pandas string ops, optionally in parallel across processes. Results are
+written incrementally (JSONL by default), so memory stays bounded
+however large the dump is.
+
+    python -m app.scripts.process_books --workers 8 --format jsonl
+"""
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 RAW_PATH = Path("data/raw/google_books.csv")
-OUT_PATH = Path("data/processed/books_clean.json")
+OUT_PATH = Path("data/processed/books_clean.jsonl")
+CHUNK_SIZE = 50_000
 
 FALLBACK_COVERS = [
     "https://i.pinimg.com/736x/77/0f/0d/770f0d8f18ae23ddb49bed419da98621.jpg",
@@ -14,54 +28,212 @@ FALLBACK_COVERS = [
     "https://i.pinimg.com/736x/b4/2c/b3/b42cb3164a4375c487e1ff69ac5a9c28.jpg",
 ]
 
-fallback_cycle = cycle(FALLBACK_COVERS)
+TEXT_COLUMNS = ["book_id", "title", "authors", "description", "categories", "thumbnail", "language"]
 
-def clean_title(title: str) -> str:
-    title = title.strip()
-    title = re.sub(r"\s*[\(\[].*?[\)\]]$", "", title)
-    return title
+COLUMNS = [
+    "id", "title", "author", "description", "genres", "pages",
+    "language", "rating", "rating_count", "cover_url",
+]
 
-def parse_genres(raw: str):
-    if not isinstance(raw, str):
-        return []
-    raw = raw.replace("/", ",")
-    return [g.strip().title() for g in raw.split(",") if g.strip()]
 
-def get_cover(thumbnail):
-    if isinstance(thumbnail, str) and thumbnail.strip():
-        return thumbnail
-    return next(fallback_cycle)
+def clean_titles(titles: pd.Series) -> pd.Series:
+    return (
+        titles.fillna("nan")
+        .str.strip()
+        .str.replace(r"\s*[\(\[].*?[\)\]]$", "", regex=True)
+    )
 
-def main():
-    df = pd.read_csv(RAW_PATH)
 
-    books = []
+def parse_genres(categories: pd.Series) -> pd.Series:
+    genres = (
+        categories.str.replace("/", ",", regex=False)
+        .str.split(",")
+        .explode()
+        .str.strip()
+    )
+    genres = genres[genres.notna() & (genres != "")].str.title()
+
+    grouped = genres.groupby(level=0).agg(list)
+    return grouped.reindex(categories.index).apply(
+        lambda g: g if isinstance(g, list) else []
+    )
+
+
+def to_int(values: pd.Series) -> pd.Series:
+    """
+    Nullable integers, truncating fractions ("250.5" -> 250) like int()
+    did. Unparseable or out-of-range values become <NA>.
+    """
+    numbers = np.trunc(pd.to_numeric(values, errors="coerce").astype("Float64"))
+    return numbers.where(numbers.abs() < 2**63).astype("Int64")
+
+
+def process_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean one chunk. cover_url is left empty where a fallback is needed;
+    fallbacks are assigned in order by the writer.
+    """
+    df = df[df["description"].notna()]
+
+    thumbnails = df["thumbnail"].where(df["thumbnail"].fillna("").str.strip() != "")
+
+    return pd.DataFrame({
+        "id": df["book_id"].fillna("nan"),
+        "title": clean_titles(df["title"]),
+        "author": df["authors"].fillna("nan").str.strip(),
+        "description": df["description"].str.strip(),
+        "genres": parse_genres(df["categories"]),
+        "pages": to_int(df["page_count"]),
+        "language": df["language"],
+        "rating": pd.to_numeric(df["average_rating"], errors="coerce"),
+        "rating_count": to_int(df["ratings_count"]),
+        "cover_url": thumbnails,
+    }, columns=COLUMNS)
+
+
+def fill_covers(df: pd.DataFrame, offset: int) -> int:
+    """
+    Cycle through FALLBACK_COVERS for books without a thumbnail,
+    continuing from offset. Returns the new offset.
+    """
+    missing = df["cover_url"].isna()
+    count = int(missing.sum())
+
+    if count:
+        df.loc[missing, "cover_url"] = [
+            FALLBACK_COVERS[(offset + i) % len(FALLBACK_COVERS)] for i in range(count)
+        ]
+
+    return offset + count
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+class JsonlWriter:
+    def __init__(self, path: Path):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if len(df):
+            # Whether lines=True ends with a newline depends on the pandas
+            # version; chunks must not be separated by a blank line
+            body = df.to_json(orient="records", lines=True, force_ascii=False)
+            self.f.write(body if body.endswith("\n") else body + "\n")
 
-    for _, row in df.iterrows():
-        if not isinstance(row.get("description"), str):
-            continue
+    def close(self) -> None:
+        self.f.close()
+
+
+class JsonArrayWriter(JsonlWriter):
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.f.write("[\n")
+        self.first = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not len(df):
+            return
+        body = df.to_json(orient="records", force_ascii=False)[1:-1]
+        self.f.write(("" if self.first else ",\n") + body)
+        self.first = False
+
+    def close(self) -> None:
+        self.f.write("\n]\n")
+        super().close()
+
+
+class ParquetWriter:
+    def __init__(self, path: Path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet output needs pyarrow installed") from exc
+
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {
+    "jsonl": JsonlWriter,
+    "json": JsonArrayWriter,
+    "parquet": ParquetWriter,
+}
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+def read_chunks(path: Path, chunk_size: int):
+    return pd.read_csv(
+        path,
+        chunksize=chunk_size,
+        dtype={c: "string" for c in TEXT_COLUMNS},
+    )
+
+
+def iter_processed(path: Path, chunk_size: int, workers: int):
+    """
+    Processed chunks in input order. With workers > 1 chunks are cleaned
+    in a process pool, with at most 2 * workers chunks in flight.
+    """
+    if workers <= 1:
+        for chunk in read_chunks(path, chunk_size):
+            yield process_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        for chunk in read_chunks(path, chunk_size):
+            pending.append(pool.submit(process_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", type=Path, default=RAW_PATH)
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
 
-        book = {
-            "id": str(row.get("book_id")),
-            "title": clean_title(str(row.get("title", ""))),
-            "author": str(row.get("authors", "")).strip(),
-            "description": row.get("description").strip(),
-            "genres": parse_genres(row.get("categories")),
-            "pages": int(row.get("page_count")) if not pd.isna(row.get("page_count")) else None,
-            "language": row.get("language"),
-            "rating": float(row.get("average_rating")) if not pd.isna(row.get("average_rating")) else None,
-            "rating_count": int(row.get("ratings_count")) if not pd.isna(row.get("ratings_count")) else None,
-            "cover_url": get_cover(row.get("thumbnail")),
-        }
+    out_path = args.output or OUT_PATH.with_suffix(f".{args.format}")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        books.append(book)
+    writer = WRITERS[args.format](out_path)
+    total = 0
+    covers = 0
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        for df in iter_processed(args.input, args.chunk_size, args.workers):
+            covers = fill_covers(df, covers)
+            writer.write(df)
+            total += len(df)
+            print(f"Processed {total} books")
+    finally:
+        writer.close()
 
-    with open(OUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(books, f, ensure_ascii=False, indent=2)
+    print(f"Processed {total} books → {out_path}")
 
-    print(f"Processed {len(books)} books → {OUT_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,11 @@
 import json
+from app.db.bulk import upsert_rows
 from app.db.session import SessionLocal
 from app.db.models.book import Book
-from app.ml.embedding import embed_text
 from app.ml.builders import build_book_text
+from app.vector.embedding_store import encode_with_store
+
+TEXT_BUILDER_VERSION = "seed-v1"  # bump when build_book_text changes
 
 BOOKS = [
     {
@@ -13,7 +16,7 @@ BOOKS = [
     "vibes": ["Emotional & Deep", "Romantic & Swoony"],
     "themes": ["Love Triangle", "Self Discovery", "Betrayal"],
     "description": "A reclusive Hollywood icon opens up about her glamorous and scandalous life.",
-   " pages": 400,
+    "pages": 400,
   },
   {
     "id": "2",
@@ -82,7 +85,7 @@ BOOKS = [
     "genres": ["Fantasy", "Historical", "Romance"],
     "vibes": ["Emotional & Deep", "Romantic & Swoony"],
     "themes": ["Friendship", "Love Triangle", "Betrayal"],
-   " description": "A retelling of the Trojan War through the eyes of Patroclus.",
+    "description": "A retelling of the Trojan War through the eyes of Patroclus.",
     "pages": 352,
   },
   {
@@ -107,15 +110,26 @@ BOOKS = [
   },
 ]
 
+LIST_FIELDS = ("genres", "vibes", "themes")
+
 def run():
     db = SessionLocal()
 
-    for data in BOOKS:
-        text = build_book_text(type("Obj", (), data))
-        embedding = embed_text(text)
+    # One batched encode for the whole catalog
+    texts = [build_book_text(type("Obj", (), data)) for data in BOOKS]
+    embeddings = encode_with_store(texts, TEXT_BUILDER_VERSION)
+
+    rows = [
+        {
+            **data,
+            **{field: json.dumps(data[field]) for field in LIST_FIELDS},
+            "embedding": embedding,
+        }
+        for data, embedding in zip(BOOKS, embeddings)
+    ]
 
-        book = Book(**data, embedding=json.dumps(embedding))
-        db.merge(book)
+    # One multi-row upsert instead of a merge (SELECT + write) per book
+    upsert_rows(db, Book, rows)
 
     db.commit()
     db.close()
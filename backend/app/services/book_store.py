@@ -0,0 +1,113 @@
+"""
+Compact in-process copy of the catalog used to hydrate the final
+recommendations, so vector search only has to return scoring fields.
+"""
+import sys
+import threading
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils.corpus import iter_books
+from app.vector.backend import get_vector_backend
+from app.vector.corpus import BinaryCorpus
+
+
+class BookRecord:
+    __slots__ = ("id", "title", "author", "description", "genres", "pages", "cover_url")
+
+    def __init__(self, id, title, author, description, genres, pages, cover_url):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.description = description
+        self.genres = genres
+        self.pages = pages
+        self.cover_url = cover_url
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BookRecord":
+        return cls(
+            id=str(data["id"]),
+            title=data.get("title"),
+            author=data.get("author"),
+            description=data.get("description"),
+            # A catalog has few distinct genres; share the strings
+            genres=tuple(sys.intern(g) for g in data.get("genres") or []),
+            pages=data.get("pages"),
+            cover_url=data.get("cover_url"),
+        )
+
+
+class BookStore:
+    """
+    Book records by ID. Backed either by records loaded up front, or by
+    a memory-mapped binary corpus read on demand.
+    """
+
+    def __init__(
+        self,
+        records: dict[str, BookRecord] | None = None,
+        corpus: BinaryCorpus | None = None,
+    ):
+        self.records = records or {}
+        self.corpus = corpus
+
+    @classmethod
+    def load(cls, path: Path) -> "BookStore":
+        if not path.exists():
+            return cls()
+
+        return cls({str(b["id"]): BookRecord.from_dict(b) for b in iter_books(path)})
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get_many(self, book_ids: list[str], collection: str) -> dict[str, BookRecord]:
+        """
+        Records for the given IDs. Books missing from the local copy are
+        read from the corpus, then fetched from the vector store in one
+        call, and kept.
+        """
+        found = {}
+        missing = []
+
+        for book_id in book_ids:
+            record = self.records.get(book_id)
+            if record is None:
+                missing.append(book_id)
+            else:
+                found[book_id] = record
+
+        if missing and self.corpus is not None:
+            rows = self.corpus.rows_of(missing)
+            for data in self.corpus.records(list(rows.values())):
+                record = BookRecord.from_dict(data)
+                self.records[record.id] = record
+                found[record.id] = record
+            missing = [b for b in missing if b not in found]
+
+        if missing:
+            for hit in get_vector_backend(collection).retrieve(missing):
+                record = BookRecord.from_dict({"id": hit.id, **hit.payload})
+                self.records[record.id] = record
+                found[record.id] = record
+
+        return found
+
+
+_store: BookStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_book_store() -> BookStore:
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if BinaryCorpus.exists():
+                    _store = BookStore(corpus=BinaryCorpus.open())
+                else:
+                    _store = BookStore.load(Path(settings.BOOKS_DATA_PATH))
+
+    return _store
@@ -0,0 +1,98 @@
+"""
+Stored top-N results per user (precomputed_recommendations).
+
+The online path serves a stored row when it is fresh and, off the
+request path, stores what it computes otherwise;
+app.scripts.precompute_recommendations refreshes rows of active users
+that went stale since.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.v1.schemas import BookResponse, RecommendRequest
+from app.core.config import settings
+from app.db.bulk import upsert_rows
+from app.db.models.precomputed import PrecomputedRecommendation
+from app.db.models.taste_profile import UserTasteProfile
+from app.services.response_cache import request_key
+from app.vector.catalog_version import catalog_version
+
+
+def request_digest(payload: RecommendRequest) -> str:
+    return hashlib.sha256(json.dumps(request_key(payload)).encode("utf-8")).hexdigest()
+
+
+def fresh_after(now: datetime | None = None) -> datetime:
+    return (now or datetime.utcnow()) - timedelta(seconds=settings.PRECOMPUTED_TTL_SECONDS)
+
+
+def get_precomputed(db: Session, payload: RecommendRequest) -> tuple[list[BookResponse] | None, int | None]:
+    """
+    (results, profile_version) with one primary-key read. results is
+    None unless the stored row is fresh for this request; the version
+    is None for users without a taste profile.
+    """
+    row = db.execute(
+        select(PrecomputedRecommendation, UserTasteProfile.version)
+        .select_from(UserTasteProfile)
+        .outerjoin(
+            PrecomputedRecommendation,
+            PrecomputedRecommendation.user_id == UserTasteProfile.user_id,
+        )
+        .where(UserTasteProfile.user_id == payload.user_id)
+    ).first()
+
+    if row is None:
+        # No profile yet: nothing worth storing for this user
+        return None, None
+
+    stored, version = row
+
+    if (
+        stored is None
+        or stored.profile_version != version
+        or stored.request_key != request_digest(payload)
+        or stored.catalog_version != catalog_version()
+        or stored.computed_at < fresh_after()
+    ):
+        return None, version
+
+    return [BookResponse(**r) for r in stored.results], version
+
+
+def precomputed_row(
+    payload: RecommendRequest,
+    results: list[BookResponse],
+    profile_version: int,
+    catalog: str | None = None,
+) -> dict:
+    """
+    catalog: the catalog version the results were computed against
+    (read it before computing); defaults to the current one.
+    """
+    return {
+        "user_id": payload.user_id,
+        "request_key": request_digest(payload),
+        "request": payload.model_dump(mode="json"),
+        "profile_version": profile_version,
+        "catalog_version": catalog_version() if catalog is None else catalog,
+        "results": [r.model_dump(mode="json") for r in results],
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def store_precomputed(
+    db: Session,
+    payload: RecommendRequest,
+    results: list[BookResponse],
+    profile_version: int,
+    catalog: str | None = None,
+) -> None:
+    upsert_rows(db, PrecomputedRecommendation, [
+        precomputed_row(payload, results, profile_version, catalog)
+    ])
+    db.commit()
@@ -1 +1,295 @@
-    
\ No newline at end of file
+import asyncio
+import logging
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.v1.schemas import RecommendRequest, BookResponse
+from app.core.config import settings
+from app.core.timing import span, timed
+from app.services.book_store import get_book_store
+from app.services.explain import build_reasons
+from app.services.precomputed import get_precomputed, store_precomputed
+from app.services.response_cache import response_cache
+from app.services.scoring import score_candidates, search_filters, top_indices
+from app.services.taste_profile import get_taste_vector, get_taste_vectors
+from app.services.user_profile import blend_vectors
+from app.vector.backend import SearchQuery, get_vector_backend
+from app.vector.catalog_version import catalog_version
+from app.vector.facets import build_prompt_vector_async, build_prompt_vectors
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "books_clean"
+
+# Precomputed-row writes in flight; beyond this, misses are not stored
+MAX_PENDING_STORES = 64
+_pending_stores: set[asyncio.Task] = set()
+
+# Payload fields the re-ranker needs; everything else is hydrated
+# from the book store for the final results only
+SCORING_FIELDS = ["id", "genres", "genre_mask", "pages"]
+
+
+def rank_hits(
+    payload: RecommendRequest,
+    hits,
+    used_taste_vector: bool,
+) -> list[BookResponse]:
+    """
+    Score every candidate in one vectorized pass, then hydrate and
+    build response objects only for the top payload.limit.
+    """
+    payloads = [hit.payload or {} for hit in hits]
+
+    final, g_scores, p_scores = score_candidates(
+        payload.genres,
+        payload.lengthPreference,
+        [hit.score for hit in hits],
+        payloads,
+    )
+
+    top = top_indices(final, payload.limit)
+    books = get_book_store().get_many(
+        [hits[i].id for i in top],
+        collection=COLLECTION_NAME,
+    )
+
+    ranked = []
+
+    for i in top:
+        book = books.get(hits[i].id)
+        if book is None:
+            continue
+
+        reasons = build_reasons(
+            vector_score=hits[i].score,
+            genre_score=g_scores[i],
+            page_score=p_scores[i],
+            user_genres=payload.genres,
+            book_genres=list(book.genres),
+            used_taste_vector=used_taste_vector,
+            pages=book.pages,
+        )
+
+        ranked.append(
+            BookResponse(
+                id=book.id,
+                title=book.title,
+                author=book.author,
+                description=book.description,
+                genres=list(book.genres),
+                pages=book.pages,
+                cover_url=book.cover_url,
+                score=round(float(final[i]), 4),
+                reasons=reasons,
+            )
+        )
+
+    return ranked
+
+
+def _filters(payload: RecommendRequest):
+    if not settings.SEARCH_PREFILTER:
+        return [None]
+    return search_filters(payload.genres, payload.lengthPreference)
+
+
+def _merge(hits: list, new_hits: list, seen: set) -> None:
+    for hit in new_hits:
+        if hit.id not in seen:
+            seen.add(hit.id)
+            hits.append(hit)
+
+
+async def search_candidates_async(vector: list[float], payload: RecommendRequest) -> list:
+    """
+    Search with the preferences as a pre-filter. Only when too few
+    candidates come back, retry with a relaxed filter.
+    """
+    backend = get_vector_backend(COLLECTION_NAME)
+    wanted = payload.limit * settings.RERANK_OVERFETCH
+
+    hits, seen = [], set()
+    for query_filter in _filters(payload):
+        _merge(hits, await backend.search_async(
+            vector,
+            limit=wanted,
+            query_filter=query_filter,
+            with_payload=SCORING_FIELDS,
+        ), seen)
+        if len(hits) >= wanted:
+            break
+
+    return hits
+
+
+async def recommend_async(db: Session, payload: RecommendRequest) -> list[BookResponse]:
+    """
+    Async pipeline: the prompt embedding (on the inference executor) and
+    the taste-profile read (on the threadpool) run concurrently, then a
+    non-blocking vector search.
+    """
+    prompt_vector, taste_vector = await asyncio.gather(
+        timed("prompt_embedding", build_prompt_vector_async(
+            payload.genres,
+            payload.vibes,
+            payload.themes,
+            payload.pacePreference,
+            payload.lengthPreference,
+        )),
+        timed("taste_vector", run_in_threadpool(get_taste_vector, db, payload.user_id)),
+    )
+
+    vector = blend_vectors(
+        prompt_vector=prompt_vector,
+        taste_vector=taste_vector,
+    )
+
+    with span("vector_search"):
+        hits = await search_candidates_async(vector, payload)
+
+    with span("rerank"):
+        # Hydration can fall through to the corpus or the vector store
+        return await run_in_threadpool(
+            rank_hits, payload, hits, used_taste_vector=taste_vector is not None
+        )
+
+
+def search_candidates_batch(vectors: list, payloads: list[RecommendRequest]) -> list[list]:
+    """
+    search_candidates_async for many requests. Each relaxation step is one
+    search_batch call covering every request still short of candidates.
+    """
+    backend = get_vector_backend(COLLECTION_NAME)
+    wanted = [p.limit * settings.RERANK_OVERFETCH for p in payloads]
+    ladders = [_filters(p) for p in payloads]
+
+    hits = [[] for _ in payloads]
+    seen = [set() for _ in payloads]
+    active = list(range(len(payloads)))
+    step = 0
+
+    while active:
+        results = backend.search_batch([
+            SearchQuery(
+                vectors[i],
+                limit=wanted[i],
+                query_filter=ladders[i][step],
+                with_payload=SCORING_FIELDS,
+            )
+            for i in active
+        ])
+
+        for i, new_hits in zip(active, results):
+            _merge(hits[i], new_hits, seen[i])
+
+        step += 1
+        active = [
+            i for i in active
+            if len(hits[i]) < wanted[i] and step < len(ladders[i])
+        ]
+
+    return hits
+
+
+def recommend_many(db: Session, payloads: list[RecommendRequest]) -> list[list[BookResponse]]:
+    """
+    recommend_async() for many requests at once: one batched encode for the
+    prompts, one query for the taste profiles, and one vector search
+    round-trip per relaxation step, then a per-request re-rank.
+    """
+    if not payloads:
+        return []
+
+    with span("prompt_embedding"):
+        prompt_vectors = build_prompt_vectors([
+            (p.genres, p.vibes, p.themes, p.pacePreference, p.lengthPreference)
+            for p in payloads
+        ])
+
+    with span("taste_vector"):
+        taste_vectors = get_taste_vectors(db, [p.user_id for p in payloads])
+
+    vectors = [
+        blend_vectors(prompt_vector=prompt, taste_vector=taste_vectors.get(p.user_id))
+        for p, prompt in zip(payloads, prompt_vectors)
+    ]
+
+    with span("vector_search"):
+        hits = search_candidates_batch(vectors, payloads)
+
+    with span("rerank"):
+        return [
+            rank_hits(p, h, used_taste_vector=p.user_id in taste_vectors)
+            for p, h in zip(payloads, hits)
+        ]
+
+
+def _store_detached(bind, payload, results, profile_version, catalog) -> None:
+    db = Session(bind=bind, autoflush=False)
+    try:
+        store_precomputed(db, payload, results, profile_version, catalog)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to store precomputed recommendations")
+    finally:
+        db.close()
+
+
+def _store_later(db: Session, *args) -> None:
+    """
+    Best-effort write of a precomputed row after the response, on a
+    session of its own; skipped when too many writes are in flight.
+    """
+    if len(_pending_stores) >= MAX_PENDING_STORES:
+        return
+
+    task = asyncio.create_task(run_in_threadpool(_store_detached, db.get_bind(), *args))
+    _pending_stores.add(task)
+    task.add_done_callback(_pending_stores.discard)
+
+
+async def recommend_stored(db: Session, payload: RecommendRequest) -> list[BookResponse]:
+    """
+    Serve fresh precomputed results with one indexed read; otherwise
+    compute online and store the result for the next visit, off the
+    request path.
+    """
+    if not settings.PRECOMPUTED_RECOMMENDATIONS:
+        return await recommend_async(db, payload)
+
+    catalog = catalog_version()
+    results, profile_version = await run_in_threadpool(get_precomputed, db, payload)
+    if results is not None:
+        return results
+
+    results = await recommend_async(db, payload)
+
+    if profile_version is not None:
+        _store_later(db, payload, results, profile_version, catalog)
+
+    return results
+
+
+async def recommend_cached(db: Session, payload: RecommendRequest) -> list[BookResponse]:
+    """
+    recommend_stored behind the response cache. Cached results for a user
+    are dropped as soon as they record a signal.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return await recommend_stored(db, payload)
+
+    bind = db.get_bind()
+
+    async def compute() -> list[BookResponse]:
+        # Shared by every caller with the same key and may outlive this
+        # one, whose session closes when its request ends: use a session
+        # of its own, on the same engine
+        own = Session(bind=bind, autoflush=False)
+        try:
+            return await recommend_stored(own, payload)
+        finally:
+            own.close()
+
+    return await response_cache.get_or_compute(payload, compute)
@@ -0,0 +1,173 @@
+"""
+Cache of /recommend responses.
+
+Entries are keyed by the normalized request plus the user's signal
+version. Recording a signal bumps the version, so a user's cached
+results go stale as soon as they interact with something, and are
+otherwise served until the TTL expires.
+
+Concurrent misses for the same key are coalesced: one request computes,
+the rest await its result. The shared computation outlives any single
+caller, so it must not use a caller's request-scoped resources.
+
+The storage backends are pluggable (ResponseCacheBackend,
+SignalVersions); the in-process ones are per worker, so with several
+workers a bump only reaches the worker that recorded the signal and
+the TTL bounds staleness elsewhere.
+"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.api.v1.schemas import RecommendRequest
+from app.core.config import settings
+from app.vector.cache import LRUCache
+
+
+def _normalize(values: list[str]) -> tuple[str, ...]:
+    # Order never affects the result; case and repeats can
+    return tuple(sorted(" ".join(v.split()) for v in values))
+
+
+def request_key(payload: RecommendRequest) -> tuple:
+    return (
+        str(payload.user_id),
+        _normalize(payload.genres),
+        _normalize(payload.vibes),
+        _normalize(payload.themes),
+        payload.pacePreference,
+        payload.lengthPreference,
+        payload.limit,
+    )
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class ResponseCacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: Hashable) -> Any | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InProcessCacheBackend(ResponseCacheBackend):
+    def __init__(self, maxsize: int, ttl: float | None):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: Hashable) -> Any | None:
+        return self.cache.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.cache.set(key, value)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class SignalVersions(ABC):
+    @abstractmethod
+    def get(self, user_id) -> int:
+        ...
+
+    @abstractmethod
+    def bump(self, user_ids) -> None:
+        ...
+
+
+class InProcessSignalVersions(SignalVersions):
+    """
+    Versions drawn from one increasing counter, for at most maxsize
+    users (least recently bumped are evicted). An evicted user reads as
+    the highest evicted version: never lower than their last one, so
+    results cached before their last bump stay unreachable.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id) -> int:
+        return self._versions.get(str(user_id), self._floor)
+
+    def bump(self, user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._counter += 1
+                key = str(user_id)
+                self._versions[key] = self._counter
+                self._versions.move_to_end(key)
+
+            while len(self._versions) > self.maxsize:
+                _, evicted = self._versions.popitem(last=False)
+                self._floor = max(self._floor, evicted)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+class ResponseCache:
+    def __init__(self, backend: ResponseCacheBackend, versions: SignalVersions):
+        self.backend = backend
+        self.versions = versions
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def key_for(self, payload: RecommendRequest) -> tuple:
+        return (request_key(payload), self.versions.get(payload.user_id))
+
+    async def get_or_compute(
+        self,
+        payload: RecommendRequest,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = self.key_for(payload)
+
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached
+
+        # Single flight: identical misses share one computation. It runs
+        # as its own task, so a disconnecting caller does not cancel it
+        # for the others.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.backend.set(key, task.result())
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "inflight": len(self._inflight)}
+
+
+response_cache = ResponseCache(
+    InProcessCacheBackend(
+        maxsize=settings.RESPONSE_CACHE_SIZE,
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    ),
+    InProcessSignalVersions(maxsize=settings.RESPONSE_CACHE_VERSIONS_SIZE),
+)
+
+
+def bump_signal_versions(user_ids) -> None:
+    response_cache.versions.bump(user_ids)
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+from operator import methodcaller
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.vector.backend import PayloadFilter, RangeCondition
+
+# Weights of the final blended score
+VECTOR_WEIGHT = 0.6
+GENRE_WEIGHT = 0.25
+PAGE_WEIGHT = 0.15
+
+# Length preference -> page range that scores 1.0
+PAGE_RANGES = {
+    "Short (<300 pages)": RangeCondition(lt=300),
+    "Medium (300-450 pages)": RangeCondition(gte=300, lte=450),
+    "Long (450+ pages)": RangeCondition(gt=450),
+}
+
+
+def search_filters(
+    user_genres: list[str],
+    length_preference: str | None,
+) -> list[PayloadFilter | None]:
+    """
+    Pre-filters to try in order, from strictest to none. Each step drops
+    a constraint, so a narrow preference can fall back to wider searches.
+    """
+    ladder = []
+    page_range = PAGE_RANGES.get(length_preference) if length_preference else None
+    ranges = {"pages": page_range} if page_range else {}
+
+    if user_genres:
+        # Catalog genres are title-cased at processing time
+        genres = sorted(set(user_genres) | {g.strip().title() for g in user_genres})
+        ladder.append(PayloadFilter(match_any={"genres": genres}, ranges=ranges))
+
+    if ranges:
+        ladder.append(PayloadFilter(ranges=ranges))
+
+    ladder.append(None)
+    return ladder
+
+
+# -----------------------------
+# Genre vocabulary
+# -----------------------------
+# Payload integers are signed 64-bit; keep the top bit clear
+MASK_WORD_BITS = 63
+
+
+def _genre_key(genre: str) -> str:
+    return genre.strip().lower()
+
+
+class GenreVocab:
+    """
+    Normalized genre -> bit position, built from the catalog at ingest.
+
+    Each book stores its genres as a bitmask (genre_mask: a list of
+    63-bit words) so re-ranking is an AND plus popcount over all
+    candidates. Only ingest adds genres, and only appends, so stored
+    masks stay valid; on the request path a genre without a bit matches
+    nothing.
+    """
+
+    def __init__(self, genres: list[str] | None = None):
+        self.genres: list[str] = []
+        self.bits: dict[str, int] = {}
+        self.extend(genres or [])
+
+    @property
+    def words(self) -> int:
+        return max(1, -(-len(self.genres) // MASK_WORD_BITS))
+
+    def extend(self, genres: Iterable[str]) -> int:
+        """
+        Add unseen genres; returns how many were added.
+        """
+        added = 0
+        for genre in genres:
+            key = _genre_key(genre)
+            if key and key not in self.bits:
+                self.bits[key] = len(self.genres)
+                self.genres.append(key)
+                added += 1
+        return added
+
+    def mask(self, genres: Iterable[str]) -> list[int]:
+        words = [0] * self.words
+        for genre in genres:
+            bit = self.bits.get(_genre_key(genre))
+            if bit is not None:
+                words[bit // MASK_WORD_BITS] |= 1 << (bit % MASK_WORD_BITS)
+        return words
+
+    @classmethod
+    def load(cls, path: Path) -> "GenreVocab":
+        if not path.exists():
+            return cls()
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.genres, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+_vocab: tuple[float, GenreVocab] | None = None
+_vocab_lock = threading.Lock()
+
+
+def get_genre_vocab() -> GenreVocab:
+    """
+    The vocabulary the index was built with, re-read when ingest
+    rewrites it. Read-only on the request path.
+    """
+    global _vocab
+
+    path = Path(settings.GENRE_VOCAB_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return GenreVocab()
+
+    cached = _vocab
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _vocab_lock:
+        vocab = GenreVocab.load(path)
+        _vocab = (mtime, vocab)
+
+    return vocab
+
+
+# -----------------------------
+# Batched scoring
+# -----------------------------
+def genre_masks(payloads: list[dict], vocab: GenreVocab) -> np.ndarray:
+    """
+    (n, vocab.words) genre bitmasks of the candidates. Payloads indexed
+    without a genre_mask are encoded from their genres.
+    """
+    masks = np.zeros((len(payloads), vocab.words), dtype=np.uint64)
+    stored = list(map(methodcaller("get", "genre_mask"), payloads))
+
+    try:
+        # One conversion when every payload has a mask of the same width
+        packed = np.array(stored, dtype=np.uint64)
+    except (TypeError, ValueError):
+        packed = None
+
+    if packed is not None and packed.ndim == 2:
+        width = min(vocab.words, packed.shape[1])
+        masks[:, :width] = packed[:, :width]
+        return masks
+
+    for i, (mask, payload) in enumerate(zip(stored, payloads)):
+        if mask is None:
+            mask = vocab.mask(payload.get("genres") or [])
+        mask = mask[: vocab.words]
+        masks[i, : len(mask)] = mask
+
+    return masks
+
+
+def genre_overlap_scores(
+    user_genres: list[str],
+    payloads: list[dict],
+    vocab: GenreVocab | None = None,
+) -> np.ndarray:
+    """
+    Share of the user's genres each candidate has: popcount of the
+    candidate's genre mask ANDed with the user's.
+    """
+    if not user_genres or not payloads:
+        return np.zeros(len(payloads))
+
+    vocab = vocab or get_genre_vocab()
+    wanted = np.array(vocab.mask(user_genres), dtype=np.uint64)
+
+    matches = np.bitwise_count(genre_masks(payloads, vocab) & wanted).sum(axis=1)
+    return matches / len(user_genres)
+
+
+def page_counts(payloads: list[dict]) -> np.ndarray:
+    """
+    Page counts of the candidates; missing or non-numeric ones are NaN.
+    """
+    pages = list(map(methodcaller("get", "pages"), payloads))
+
+    try:
+        # None converts to NaN
+        return np.array(pages, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array(
+            [p if isinstance(p, (int, float)) else np.nan for p in pages],
+            dtype=np.float64,
+        )
+
+
+def page_scores(preference: str | None, pages: np.ndarray) -> np.ndarray:
+    r = PAGE_RANGES.get(preference) if preference else None
+    if r is None:
+        return np.zeros(len(pages))
+
+    mask = pages > 0
+    if r.gt is not None:
+        mask &= pages > r.gt
+    if r.gte is not None:
+        mask &= pages >= r.gte
+    if r.lt is not None:
+        mask &= pages < r.lt
+    if r.lte is not None:
+        mask &= pages <= r.lte
+
+    return mask.astype(np.float64)
+
+
+def score_candidates(
+    user_genres: list[str],
+    length_preference: str | None,
+    scores: list[float],
+    payloads: list[dict],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Genre, page and final scores for all candidates at once.
+    """
+    v_scores = np.asarray(scores, dtype=np.float64)
+
+    pages = page_counts(payloads)
+
+    g_scores = genre_overlap_scores(user_genres, payloads)
+    p_scores = page_scores(length_preference, pages)
+
+    final = VECTOR_WEIGHT * v_scores + GENRE_WEIGHT * g_scores + PAGE_WEIGHT * p_scores
+
+    return final, g_scores, p_scores
+
+
+def top_indices(final: np.ndarray, limit: int) -> np.ndarray:
+    if final.size == 0 or limit <= 0:
+        return np.array([], dtype=np.int64)
+
+    k = min(limit, final.size)
+    top = np.argpartition(-final, k - 1)[:k]
+    return top[np.argsort(-final[top], kind="stable")]
@@ -0,0 +1,240 @@
+"""
+Write-behind buffer for user signals.
+
+Endpoints hand events to the buffer and return immediately. A background
+thread writes them in batches, one multi-row INSERT plus one batched
+taste-profile update per transaction, when flush_size events are
+pending or flush_interval_ms has passed. When max_size events are
+pending, submit() raises BufferFull so the endpoint can shed load.
+close() flushes what is left; it runs at shutdown.
+
+Clients are told "ok" before the write, so a failed flush is not
+dropped: the batch is retried ahead of newer events, with exponential
+backoff, up to max_retries times. Only then is it dropped (and counted
+as such).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.db.models.user_signal import UserSignal
+from app.services.response_cache import bump_signal_versions
+from app.services.taste_profile import apply_signals
+
+logger = logging.getLogger(__name__)
+
+flush_size_histogram = Histogram(
+    "signal_flush_size",
+    buckets=[1, 10, 50, 100, 250, 500, 1000, 2500],
+    description="Signals written per flush",
+)
+
+
+class BufferFull(Exception):
+    pass
+
+
+def write_signals(db, events: list[dict]) -> None:
+    """
+    Insert the events with one multi-row INSERT and fold them into the
+    taste profiles. Does not commit.
+    """
+    db.execute(insert(UserSignal), events)
+    apply_signals(db, events)
+
+
+class SignalBuffer:
+    def __init__(
+        self,
+        session_factory,
+        max_size: int = 10_000,
+        flush_size: int = 500,
+        flush_interval_ms: float = 200.0,
+        max_retries: int = 5,
+        retry_backoff_ms: float = 200.0,
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+        # The failed batch awaiting its next attempt: (events, attempts)
+        self._retry: tuple[list[dict], int] | None = None
+        self._retry_at = 0.0
+
+        self.written = 0
+        self.failed = 0   # events in failed attempts
+        self.dropped = 0  # events given up on after max_retries
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, events: list[dict]) -> None:
+        """
+        Queue events (dicts with user_id, book_id, signal). All or none
+        are accepted; raises BufferFull when there is no room.
+        """
+        now = datetime.utcnow()
+
+        with self._cond:
+            if self._closed:
+                raise BufferFull("Signal buffer is closed")
+            if len(self._pending) + len(events) > self.max_size:
+                raise BufferFull(f"{len(self._pending)} signals pending")
+
+            self._pending.extend({"created_at": now, **e} for e in events)
+            self._ensure_started()
+
+            if len(self._pending) >= self.flush_size:
+                self._cond.notify()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="signal-buffer", daemon=True)
+            self._thread.start()
+
+    def _take(self) -> list[dict]:
+        count = min(len(self._pending), self.flush_size)
+        return [self._pending.popleft() for _ in range(count)]
+
+    def _next_batch(self) -> tuple[list[dict], int]:
+        """
+        Under the lock: a due retry first, else pending events.
+        """
+        if self._retry is not None:
+            if time.monotonic() < self._retry_at:
+                return [], 0
+            retry, self._retry = self._retry, None
+            return retry
+        return self._take(), 0
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._retry is not None:
+                    self._cond.wait_for(
+                        lambda: self._closed,
+                        timeout=max(self._retry_at - time.monotonic(), 0.0),
+                    )
+                else:
+                    self._cond.wait_for(
+                        lambda: self._closed or len(self._pending) >= self.flush_size,
+                        timeout=self.flush_interval,
+                    )
+                if self._closed:
+                    return
+                batch, attempts = self._next_batch()
+
+            if batch:
+                self._write(batch, attempts)
+
+    def _write(self, batch: list[dict], attempts: int = 0) -> None:
+        db = self.session_factory()
+        try:
+            write_signals(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to write %d signals", len(batch))
+            self._failed(batch, attempts + 1)
+            return
+        finally:
+            db.close()
+
+        # Responses computed before the taste profiles caught up must
+        # not outlive the flush
+        bump_signal_versions({e["user_id"] for e in batch})
+        self.written += len(batch)
+        flush_size_histogram.observe(len(batch))
+
+    def _failed(self, batch: list[dict], attempts: int) -> None:
+        self.failed += len(batch)
+
+        if attempts > self.max_retries:
+            self.dropped += len(batch)
+            logger.error("Dropped %d signals after %d attempts", len(batch), attempts)
+            return
+
+        with self._cond:
+            self._retry = (batch, attempts)
+            self._retry_at = time.monotonic() + self.retry_backoff * 2 ** (attempts - 1)
+
+    def flush(self) -> None:
+        """
+        Write everything pending on the calling thread, retries included.
+        """
+        while True:
+            with self._cond:
+                wait = self._retry_at - time.monotonic() if self._retry is not None else 0.0
+                if wait > 0:
+                    batch, attempts = [], 0
+                else:
+                    batch, attempts = self._next_batch()
+
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            if not batch:
+                return
+            self._write(batch, attempts)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "retrying": len(self._retry[0]) if self._retry else 0,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+_buffer: SignalBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_signal_buffer() -> SignalBuffer:
+    global _buffer
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                from app.db.session import SessionLocal
+
+                _buffer = SignalBuffer(
+                    SessionLocal,
+                    max_size=settings.SIGNAL_BUFFER_MAX_SIZE,
+                    flush_size=settings.SIGNAL_FLUSH_SIZE,
+                    flush_interval_ms=settings.SIGNAL_FLUSH_INTERVAL_MS,
+                    max_retries=settings.SIGNAL_FLUSH_MAX_RETRIES,
+                    retry_backoff_ms=settings.SIGNAL_FLUSH_RETRY_BACKOFF_MS,
+                )
+
+    return _buffer
+
+
+def close_signal_buffer() -> None:
+    if _buffer is not None:
+        _buffer.close()
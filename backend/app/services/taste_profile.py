@@ -0,0 +1,152 @@
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.bulk import insert_for
+from app.db.models.taste_profile import UserTasteProfile
+from app.services.user_profile import SIGNAL_WEIGHTS
+from app.vector.book_vectors import get_book_vectors
+
+
+def decay_factor(updated_at: datetime, now: datetime) -> float:
+    half_life = settings.TASTE_DECAY_HALF_LIFE_DAYS
+    if not half_life:
+        return 1.0
+
+    elapsed_days = max((now - updated_at).total_seconds(), 0.0) / 86400
+    return 0.5 ** (elapsed_days / half_life)
+
+
+def _fold(
+    db: Session,
+    profile: UserTasteProfile | None,
+    user_id,
+    vector: np.ndarray,
+    weight: float,
+    now: datetime,
+) -> UserTasteProfile:
+    if profile is None:
+        profile = UserTasteProfile(
+            user_id=user_id,
+            vector_sum=(weight * vector).astype(np.float32).tobytes(),
+            total_weight=weight,
+            version=1,
+            updated_at=now,
+        )
+        db.add(profile)
+        return profile
+
+    factor = decay_factor(profile.updated_at, now)
+    vector_sum = np.frombuffer(profile.vector_sum, dtype=np.float32)
+
+    profile.vector_sum = (factor * vector_sum + weight * vector).astype(np.float32).tobytes()
+    profile.total_weight = factor * profile.total_weight + weight
+    profile.version += 1
+    profile.updated_at = max(profile.updated_at, now)
+
+    return profile
+
+
+def _select_for_update(db: Session, user_ids) -> dict:
+    return {
+        p.user_id: p
+        for p in db.scalars(
+            select(UserTasteProfile)
+            .where(UserTasteProfile.user_id.in_(user_ids))
+            .order_by(UserTasteProfile.user_id)
+            .with_for_update()
+        )
+    }
+
+
+def _lock_profiles(db: Session, user_ids: set, dim: int, at: datetime) -> dict:
+    """
+    Lock the users' profiles, creating empty ones for users without one.
+
+    A locking read finds nothing to lock for a missing row, so two first
+    signals for a user would both insert it. Missing rows are created
+    with INSERT ... ON CONFLICT DO NOTHING and then locked like the rest.
+    """
+    profiles = _select_for_update(db, user_ids)
+    missing = user_ids - profiles.keys()
+
+    insert = insert_for(db.get_bind().dialect.name)
+    if not missing or insert is None:
+        # Without ON CONFLICT, _fold adds the missing rows itself
+        return profiles
+
+    empty = np.zeros(dim, dtype=np.float32).tobytes()
+    db.execute(
+        insert(UserTasteProfile)
+        .values([
+            {"user_id": u, "vector_sum": empty, "total_weight": 0.0, "version": 0, "updated_at": at}
+            for u in missing
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    profiles.update(_select_for_update(db, missing))
+    return profiles
+
+
+def apply_signals(db: Session, events: list[dict]) -> dict:
+    """
+    Fold many signals (dicts with user_id, book_id, created_at and either
+    signal or a precomputed weight) at once: one vector lookup and one
+    locking read of all affected profiles. Events are applied in time
+    order. Does not commit.
+    Returns the updated profiles by user ID.
+    """
+    vectors = get_book_vectors([e["book_id"] for e in events])
+    events = [e for e in events if e["book_id"] in vectors]
+    if not events:
+        return {}
+
+    events = sorted(events, key=lambda e: e["created_at"])
+    profiles = _lock_profiles(
+        db,
+        {e["user_id"] for e in events},
+        len(vectors[events[0]["book_id"]]),
+        events[0]["created_at"],
+    )
+
+    for event in events:
+        user_id = event["user_id"]
+        profiles[user_id] = _fold(
+            db,
+            profiles.get(user_id),
+            user_id,
+            vectors[event["book_id"]],
+            event.get("weight", SIGNAL_WEIGHTS.get(event.get("signal"), 0.1)),
+            event["created_at"],
+        )
+
+    return profiles
+
+
+def get_taste_vector(db: Session, user_id) -> list[float] | None:
+    profile = db.get(UserTasteProfile, user_id)
+
+    if profile is None or not profile.total_weight:
+        return None
+
+    vector_sum = np.frombuffer(profile.vector_sum, dtype=np.float32)
+    return (vector_sum / profile.total_weight).tolist()
+
+
+def get_taste_vectors(db: Session, user_ids: list) -> dict:
+    """
+    get_taste_vector for many users with one query. Users without a
+    profile are left out.
+    """
+    profiles = db.scalars(
+        select(UserTasteProfile).where(UserTasteProfile.user_id.in_(set(user_ids)))
+    )
+
+    return {
+        p.user_id: (np.frombuffer(p.vector_sum, dtype=np.float32) / p.total_weight).tolist()
+        for p in profiles
+        if p.total_weight
+    }
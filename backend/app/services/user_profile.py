@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 import numpy as np
 
 from app.db.models.user_signal import UserSignal
-from app.vector.embedding import embed_text
+from app.vector.book_vectors import get_book_vectors
 
 
 SIGNAL_WEIGHTS = {
@@ -27,16 +27,22 @@ def build_user_taste_vector(
     if not signals:
         return None
 
-    texts = []
+    vectors = get_book_vectors([s.book_id for s in signals])
+
+    rows = []
     weights = []
 
     for s in signals:
-        texts.append(s.book_id)  # temporary — we’ll improve this next
+        vector = vectors.get(s.book_id)
+        if vector is None:
+            continue
+        rows.append(vector)
         weights.append(SIGNAL_WEIGHTS.get(s.signal, 0.1))
 
-    vectors = embed_text(texts)
+    if not rows:
+        return None
 
-    weighted = np.average(vectors, axis=0, weights=weights)
+    weighted = np.average(np.stack(rows), axis=0, weights=weights)
 
     return weighted.tolist()
 
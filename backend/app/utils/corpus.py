@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+READ_SIZE = 1 << 16
+
+
+def iter_json_array(path: Path) -> Iterator[dict]:
+    """
+    Yield the items of a top-level JSON array one at a time, reading the
+    file in fixed-size blocks instead of parsing it whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(READ_SIZE)
+            buffer += block
+
+            while True:
+                buffer = buffer.lstrip()
+
+                if not started:
+                    if not buffer:
+                        break
+                    if buffer[0] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    buffer = buffer[1:]
+                    started = True
+                    continue
+
+                if buffer.startswith(","):
+                    buffer = buffer[1:]
+                    continue
+
+                if buffer.startswith("]"):
+                    return
+
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if not block:
+                        raise
+                    break  # need more input
+
+                yield item
+                buffer = buffer[end:]
+
+            if not block:
+                return
+
+
+def iter_books(path: Path) -> Iterator[dict]:
+    """
+    Stream book dicts from a .json array or a .jsonl file.
+    """
+    path = Path(path)
+
+    if path.suffix == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    yield from iter_json_array(path)
@@ -0,0 +1,739 @@
+"""
+Vector store backends.
+
+Everything that searches, writes or reads book vectors goes through a
+VectorBackend, selected by settings.VECTOR_BACKEND:
+
+  - "qdrant": the Qdrant server at settings.QDRANT_URL
+  - "numpy":  an in-process index over a memory-mapped float32 matrix,
+              for small catalogs, tests and benchmarks
+"""
+import asyncio
+import json
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.vector import snapshots
+
+# Stable point IDs derived from the catalog book ID, so vectors can be
+# fetched directly by book ID
+BOOK_ID_NAMESPACE = uuid.UUID("6f1c1e4e-2b1a-4c7e-9a57-0b6f4f3a2c11")
+
+
+def point_id_for(book_id: str) -> str:
+    return str(uuid.uuid5(BOOK_ID_NAMESPACE, str(book_id)))
+
+
+@dataclass
+class VectorHit:
+    id: str
+    score: float
+    payload: dict = field(default_factory=dict)
+    vector: np.ndarray | None = None
+
+
+@dataclass
+class RangeCondition:
+    gt: float | None = None
+    gte: float | None = None
+    lt: float | None = None
+    lte: float | None = None
+
+
+@dataclass
+class PayloadFilter:
+    """
+    All conditions must hold: each match_any field shares at least one
+    value with the list, each range field falls inside its bounds.
+    """
+    match_any: dict[str, list] = field(default_factory=dict)
+    ranges: dict[str, RangeCondition] = field(default_factory=dict)
+
+
+@dataclass
+class SearchQuery:
+    vector: list[float]
+    limit: int
+    query_filter: PayloadFilter | None = None
+    with_payload: bool | list[str] = True
+
+
+class VectorBackend(ABC):
+    # Whether flush() rewrites the whole index, rather than only what
+    # changed since the last flush
+    rewrites_on_flush = False
+
+    @abstractmethod
+    def ensure_collection(self, vector_size: int, recreate: bool = False) -> None:
+        ...
+
+    def ensure_payload_index(self, field_name: str, field_type: str) -> None:
+        """
+        Index a payload field ("integer" | "keyword") for filtering.
+        """
+
+    @abstractmethod
+    def search(
+        self,
+        vector: list[float],
+        limit: int,
+        query_filter: PayloadFilter | None = None,
+        with_payload: bool | list[str] = True,
+    ) -> list[VectorHit]:
+        ...
+
+    async def search_async(
+        self,
+        vector: list[float],
+        limit: int,
+        query_filter: PayloadFilter | None = None,
+        with_payload: bool | list[str] = True,
+    ) -> list[VectorHit]:
+        # A worker thread, so an in-process search does not hold up the
+        # event loop
+        return await asyncio.to_thread(self.search, vector, limit, query_filter, with_payload)
+
+    def search_batch(self, queries: list[SearchQuery]) -> list[list[VectorHit]]:
+        """
+        Hits for each query, in order. Backends override this to answer
+        all queries in one round-trip.
+        """
+        return [
+            self.search(q.vector, q.limit, q.query_filter, q.with_payload)
+            for q in queries
+        ]
+
+    @abstractmethod
+    def upsert(self, points: list[tuple[str, Any, dict]]) -> None:
+        """
+        points: (book_id, vector, payload) triples.
+        """
+
+    @abstractmethod
+    def retrieve(
+        self,
+        book_ids: list[str],
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = False,
+    ) -> list[VectorHit]:
+        ...
+
+    @abstractmethod
+    def filter(
+        self,
+        query_filter: PayloadFilter,
+        limit: int = 100,
+        with_payload: bool | list[str] = True,
+    ) -> list[VectorHit]:
+        ...
+
+    def flush(self) -> None:
+        """
+        Persist pending writes, if the backend needs it.
+        """
+
+
+# -----------------------------
+# Qdrant
+# -----------------------------
+def _as_list(vector) -> list[float]:
+    return np.asarray(vector, dtype=np.float32).tolist()
+
+
+class QdrantBackend(VectorBackend):
+    def __init__(self, collection: str, client=None, async_client=None):
+        self.collection = collection
+        self._client = client
+        self._async_client = async_client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from app.vector.client import qdrant
+            self._client = qdrant
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from app.vector.client import async_qdrant
+            self._async_client = async_qdrant
+        return self._async_client
+
+    @staticmethod
+    def to_qdrant_filter(query_filter: PayloadFilter | None):
+        if query_filter is None:
+            return None
+
+        from qdrant_client import models
+
+        must = [
+            models.FieldCondition(key=key, match=models.MatchAny(any=values))
+            for key, values in query_filter.match_any.items()
+        ]
+        must += [
+            models.FieldCondition(
+                key=key,
+                range=models.Range(gt=r.gt, gte=r.gte, lt=r.lt, lte=r.lte),
+            )
+            for key, r in query_filter.ranges.items()
+        ]
+        return models.Filter(must=must)
+
+    @staticmethod
+    def to_hit(point) -> VectorHit:
+        payload = point.payload or {}
+        vector = getattr(point, "vector", None)
+        return VectorHit(
+            id=payload.get("id", str(point.id)),
+            score=getattr(point, "score", 0.0),
+            payload=payload,
+            vector=np.asarray(vector, dtype=np.float32) if vector is not None else None,
+        )
+
+    def ensure_collection(self, vector_size: int, recreate: bool = False) -> None:
+        from qdrant_client.models import Distance, VectorParams
+
+        config = VectorParams(size=vector_size, distance=Distance.COSINE)
+
+        if recreate:
+            self.client.recreate_collection(
+                collection_name=self.collection,
+                vectors_config=config,
+            )
+            return
+
+        existing = [c.name for c in self.client.get_collections().collections]
+        if self.collection not in existing:
+            self.client.create_collection(
+                collection_name=self.collection,
+                vectors_config=config,
+            )
+
+    def ensure_payload_index(self, field_name: str, field_type: str) -> None:
+        from qdrant_client.models import PayloadSchemaType
+
+        self.client.create_payload_index(
+            collection_name=self.collection,
+            field_name=field_name,
+            field_schema=PayloadSchemaType(field_type),
+        )
+
+    def search(self, vector, limit, query_filter=None, with_payload=True):
+        response = self.client.query_points(
+            collection_name=self.collection,
+            query=_as_list(vector),
+            query_filter=self.to_qdrant_filter(query_filter),
+            limit=limit,
+            with_payload=with_payload,
+        )
+        return [self.to_hit(p) for p in response.points]
+
+    async def search_async(self, vector, limit, query_filter=None, with_payload=True):
+        response = await self.async_client.query_points(
+            collection_name=self.collection,
+            query=_as_list(vector),
+            query_filter=self.to_qdrant_filter(query_filter),
+            limit=limit,
+            with_payload=with_payload,
+        )
+        return [self.to_hit(p) for p in response.points]
+
+    def search_batch(self, queries):
+        from qdrant_client import models
+
+        if not queries:
+            return []
+
+        responses = self.client.query_batch_points(
+            collection_name=self.collection,
+            requests=[
+                models.QueryRequest(
+                    query=_as_list(q.vector),
+                    filter=self.to_qdrant_filter(q.query_filter),
+                    limit=q.limit,
+                    with_payload=q.with_payload,
+                )
+                for q in queries
+            ],
+        )
+        return [[self.to_hit(p) for p in response.points] for response in responses]
+
+    def upsert(self, points):
+        from qdrant_client.models import PointStruct
+
+        self.client.upsert(
+            collection_name=self.collection,
+            points=[
+                PointStruct(
+                    id=point_id_for(book_id),
+                    vector=np.asarray(vector, dtype=np.float32).tolist(),
+                    payload=payload,
+                )
+                for book_id, vector, payload in points
+            ],
+            wait=True,
+        )
+
+    def retrieve(self, book_ids, with_payload=True, with_vectors=False):
+        points = self.client.retrieve(
+            collection_name=self.collection,
+            ids=[point_id_for(b) for b in book_ids],
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+        )
+        return [self.to_hit(p) for p in points]
+
+    def filter(self, query_filter, limit=100, with_payload=True):
+        points, _ = self.client.scroll(
+            collection_name=self.collection,
+            scroll_filter=self.to_qdrant_filter(query_filter),
+            limit=limit,
+            with_payload=with_payload,
+        )
+        return [self.to_hit(p) for p in points]
+
+
+# -----------------------------
+# In-process NumPy
+# -----------------------------
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _select_payload(payload: dict, with_payload: bool | list[str]) -> dict:
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return {}
+    return {k: payload[k] for k in with_payload if k in payload}
+
+
+class _NumpyView(NamedTuple):
+    vectors: np.ndarray
+    size: int
+    ids: list
+    payloads: Any
+    rows: dict
+    centroids: np.ndarray | None
+    assignments: np.ndarray | None
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Exact cosine search over an (n, dim) matrix of normalized vectors.
+
+    Stored as a versioned directory (app.vector.snapshots) holding
+    vectors.npy (opened with mmap) and payloads.jsonl, one line per
+    row, or a binary corpus. With ivf_lists > 0 the rows are
+    clustered with k-means and a search only scores the ivf_nprobe
+    closest clusters.
+    """
+
+    rewrites_on_flush = True
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ivf_lists: int = 0,
+        ivf_nprobe: int = 8,
+    ):
+        self.path = Path(path) if path else None
+        self.ivf_lists = ivf_lists
+        self.ivf_nprobe = ivf_nprobe
+
+        # Rows live in the first _size rows of _matrix; the rest is
+        # spare capacity for upserts
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self.ids: list[str] = []
+        self.payloads: list[dict] = []
+        self.rows: dict[str, int] = {}
+
+        self._centroids: np.ndarray | None = None
+        self._assignments: np.ndarray | None = None
+        self._columns: dict[str, np.ndarray] = {}
+        self._postings: dict[str, dict[Any, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+        if self.path and (snapshots.resolve(self.path) / "vectors.npy").exists():
+            self.load()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[: self._size]
+
+    @vectors.setter
+    def vectors(self, matrix: np.ndarray) -> None:
+        self._matrix = matrix
+        self._size = len(matrix)
+
+    # ---- storage ----
+    def load(self) -> None:
+        directory = snapshots.resolve(self.path)
+        payloads_path = directory / "payloads.jsonl"
+
+        if not payloads_path.exists() and (directory / "meta.json").exists():
+            # A binary corpus directory (app.vector.corpus)
+            from app.vector.corpus import BinaryCorpus, PayloadView
+
+            corpus = BinaryCorpus(directory)
+            self.vectors = corpus.vectors
+            self.payloads = PayloadView(corpus)
+            self.ids = corpus.column("id").to_pylist()
+        else:
+            self.vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+            with open(payloads_path, "r", encoding="utf-8") as f:
+                self.payloads = [json.loads(line) for line in f]
+            self.ids = [str(p.get("id")) for p in self.payloads]
+
+        self.rows = {book_id: i for i, book_id in enumerate(self.ids)}
+        self._reset_derived()
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+
+        # A new version swapped in as a whole: vectors.npy may be mmapped
+        # by this or another process, and readers must never pair the
+        # vectors of one flush with the payloads of another
+        view, _ = self._view()
+        version = snapshots.new_version(self.path)
+
+        with open(version / "vectors.npy", "wb") as f:
+            np.save(f, np.ascontiguousarray(view.vectors))
+
+        with open(version / "payloads.jsonl", "w", encoding="utf-8") as f:
+            for row in range(view.size):
+                f.write(json.dumps(view.payloads[row], ensure_ascii=False) + "\n")
+
+        snapshots.publish(self.path, version, legacy=["vectors.npy", "payloads.jsonl"])
+
+    def _reset_derived(self) -> None:
+        self._centroids = None
+        self._assignments = None
+        self._columns = {}
+        self._postings = {}
+
+    def ensure_collection(self, vector_size: int, recreate: bool = False) -> None:
+        if not recreate and self._size:
+            if self.vectors.shape[1] != vector_size:
+                raise ValueError(
+                    f"index has dimension {self.vectors.shape[1]}, expected {vector_size}"
+                )
+            return
+
+        self.vectors = np.zeros((0, vector_size), dtype=np.float32)
+        self.ids, self.payloads, self.rows = [], [], {}
+        self._reset_derived()
+
+    def upsert(self, points) -> None:
+        if not points:
+            return
+
+        with self._lock:
+            vectors = _normalize(np.asarray([p[1] for p in points], dtype=np.float32))
+
+            if not isinstance(self.payloads, list):
+                # First write to a loaded corpus: take mutable copies once
+                self.payloads = list(self.payloads)
+                self.ids = list(self.ids)
+
+            # Room for every point being new; existing rows are updated in
+            # place, so a search running alongside may score one of them
+            # against either version
+            matrix = self._writable(self._size + len(points), vectors.shape[1])
+
+            new_ids = []
+            for (book_id, _, payload), vector in zip(points, vectors):
+                book_id = str(book_id)
+                row = self.rows.get(book_id)
+                if row is None:
+                    row = self._size + len(new_ids)
+                    new_ids.append(book_id)
+                    self.rows[book_id] = row
+                    self.payloads.append(payload)
+                else:
+                    self.payloads[row] = payload
+                matrix[row] = vector
+
+            # Readers only look at rows below the size they snapshot, so
+            # appended rows become visible all at once, here
+            self.ids.extend(new_ids)
+            self._size += len(new_ids)
+            self._reset_derived()
+
+    def _writable(self, rows: int, dim: int) -> np.ndarray:
+        """
+        The backing matrix, with room for at least `rows` rows. Grows
+        geometrically into a new array, so a chunked ingest copies each
+        row O(1) times and readers keep the array they started with.
+        """
+        matrix = self._matrix
+        if rows <= len(matrix) and matrix.flags.writeable:
+            return matrix
+
+        capacity = max(rows, 2 * len(matrix), 1024)
+        grown = np.zeros((capacity, dim), dtype=np.float32)
+        grown[: self._size] = matrix[: self._size]
+        self._matrix = grown
+        return grown
+
+    def _view(self, query_filter: PayloadFilter | None = None, ivf: bool = False):
+        """
+        A consistent snapshot of the index plus the filter mask over it.
+        Taken under the lock, since upsert swaps the arrays.
+        """
+        with self._lock:
+            mask = self._mask(query_filter)
+            if ivf and self._uses_ivf() and self._centroids is None:
+                self._build_ivf()
+
+            return _NumpyView(
+                self.vectors, self._size, self.ids, self.payloads, self.rows,
+                self._centroids, self._assignments,
+            ), mask
+
+    # ---- filtering ----
+    def _values(self, key: str) -> list:
+        if hasattr(self.payloads, "values"):
+            return self.payloads.values(key)
+        return [p.get(key) for p in self.payloads]
+
+    def _numeric_column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            if hasattr(self.payloads, "numeric"):
+                column = self.payloads.numeric(key)
+            else:
+                column = np.array(
+                    [v if isinstance(v, (int, float)) else np.nan for v in self._values(key)],
+                    dtype=np.float64,
+                )
+            self._columns[key] = column
+        return column
+
+    def _posting_lists(self, key: str) -> dict[Any, np.ndarray]:
+        """
+        Value -> rows holding it (for list fields, any element), built
+        once per snapshot so match_any filters never scan the payloads.
+        """
+        postings = self._postings.get(key)
+        if postings is None:
+            rows: dict[Any, list[int]] = {}
+            for row, value in enumerate(self._values(key)):
+                for item in value if isinstance(value, list) else [value]:
+                    rows.setdefault(item, []).append(row)
+
+            postings = {v: np.array(r, dtype=np.int64) for v, r in rows.items()}
+            self._postings[key] = postings
+        return postings
+
+    def _mask(self, query_filter: PayloadFilter | None) -> np.ndarray | None:
+        if query_filter is None:
+            return None
+
+        mask = np.ones(self._size, dtype=bool)
+
+        for key, r in query_filter.ranges.items():
+            column = self._numeric_column(key)
+            with np.errstate(invalid="ignore"):
+                if r.gt is not None:
+                    mask &= column > r.gt
+                if r.gte is not None:
+                    mask &= column >= r.gte
+                if r.lt is not None:
+                    mask &= column < r.lt
+                if r.lte is not None:
+                    mask &= column <= r.lte
+
+        for key, values in query_filter.match_any.items():
+            postings = self._posting_lists(key)
+            matches = np.zeros(self._size, dtype=bool)
+            for value in set(values):
+                rows = postings.get(value)
+                if rows is not None:
+                    matches[rows] = True
+            mask &= matches
+
+        return mask
+
+    # ---- IVF ----
+    def _uses_ivf(self) -> bool:
+        return bool(self.ivf_lists) and self.vectors.shape[0] > self.ivf_lists
+
+    def _build_ivf(self, iterations: int = 10, seed: int = 0) -> None:
+        n = self.vectors.shape[0]
+        lists = min(self.ivf_lists, n)
+        rng = np.random.default_rng(seed)
+
+        centroids = np.array(self.vectors[rng.choice(n, size=lists, replace=False)])
+        for _ in range(iterations):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            for c in range(lists):
+                members = self.vectors[assignments == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        self._centroids = centroids
+        self._assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+
+    def _candidate_rows(self, view: "_NumpyView", query: np.ndarray) -> np.ndarray | None:
+        if view.centroids is None:
+            return None
+
+        nprobe = min(self.ivf_nprobe, len(view.centroids))
+        probes = np.argpartition(-(view.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(view.assignments, probes))
+
+    # ---- queries ----
+    @staticmethod
+    def _hit(view: "_NumpyView", row: int, score: float, with_payload, with_vector: bool = False) -> VectorHit:
+        return VectorHit(
+            id=view.ids[row],
+            score=float(score),
+            payload=_select_payload(view.payloads[row], with_payload),
+            vector=np.asarray(view.vectors[row]) if with_vector else None,
+        )
+
+    def _top_k(self, view: "_NumpyView", scores: np.ndarray, rows: np.ndarray | None, limit: int, with_payload):
+        if scores.size == 0 or limit <= 0:
+            return []
+
+        k = min(limit, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        if rows is not None:
+            return [self._hit(view, rows[i], scores[i], with_payload) for i in top]
+        return [self._hit(view, i, scores[i], with_payload) for i in top]
+
+    def search(self, vector, limit, query_filter=None, with_payload=True):
+        view, mask = self._view(query_filter, ivf=True)
+        if not view.size:
+            return []
+
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        rows = self._candidate_rows(view, query)
+
+        if mask is not None:
+            rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+
+        if rows is None:
+            scores = view.vectors @ query
+        else:
+            scores = view.vectors[rows] @ query
+
+        return self._top_k(view, scores, rows, limit, with_payload)
+
+    def search_batch(self, queries):
+        if not self._size or self.ivf_lists:
+            return super().search_batch(queries)
+
+        # Queries with the same filter share one mask and one matrix product
+        groups: dict[str, list[int]] = {}
+        for i, q in enumerate(queries):
+            groups.setdefault(repr(q.query_filter), []).append(i)
+
+        results: list[list[VectorHit]] = [[] for _ in queries]
+
+        for members in groups.values():
+            view, mask = self._view(queries[members[0]].query_filter)
+            rows = np.flatnonzero(mask) if mask is not None else None
+
+            matrix = _normalize(np.asarray([queries[i].vector for i in members], dtype=np.float32))
+            candidates = view.vectors if rows is None else view.vectors[rows]
+            scores = candidates @ matrix.T
+
+            for j, i in enumerate(members):
+                results[i] = self._top_k(view, scores[:, j], rows, queries[i].limit, queries[i].with_payload)
+
+        return results
+
+    def retrieve(self, book_ids, with_payload=True, with_vectors=False):
+        view, _ = self._view()
+        # rows may already hold books appended after the snapshot
+        rows = [view.rows.get(str(b), view.size) for b in book_ids]
+        return [
+            self._hit(view, row, 0.0, with_payload, with_vectors)
+            for row in rows
+            if row < view.size
+        ]
+
+    def filter(self, query_filter, limit=100, with_payload=True):
+        view, mask = self._view(query_filter)
+        rows = np.flatnonzero(mask)[:limit] if mask is not None else range(min(limit, view.size))
+        return [self._hit(view, int(r), 0.0, with_payload) for r in rows]
+
+
+# -----------------------------
+# Factory
+# -----------------------------
+_backends: dict[str, VectorBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_vector_backend(collection: str) -> VectorBackend:
+    backend = _backends.get(collection)
+    if backend is not None:
+        return backend
+
+    with _backends_lock:
+        if collection not in _backends:
+            if settings.VECTOR_BACKEND == "numpy":
+                _backends[collection] = NumpyBackend(
+                    Path(settings.NUMPY_INDEX_PATH) / collection,
+                    ivf_lists=settings.NUMPY_IVF_LISTS,
+                    ivf_nprobe=settings.NUMPY_IVF_NPROBE,
+                )
+            else:
+                _backends[collection] = QdrantBackend(collection)
+
+        return _backends[collection]
+
+
+def export_collection(collection: str, batch_size: int = 256) -> int:
+    """
+    Copy a Qdrant collection into the NumPy index directory.
+    """
+    source = QdrantBackend(collection)
+    target = NumpyBackend(Path(settings.NUMPY_INDEX_PATH) / collection)
+
+    offset = None
+    total = 0
+
+    while True:
+        points, offset = source.client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        target.upsert([
+            (QdrantBackend.to_hit(p).id, p.vector, p.payload or {}) for p in points
+        ])
+        total += len(points)
+
+        if offset is None:
+            break
+
+    target.flush()
+    return total
+
+
+if __name__ == "__main__":
+    import sys
+
+    for name in sys.argv[1:] or ["books_clean"]:
+        print(f"Exported {export_collection(name)} points from {name}")
@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+batch_size_histogram = Histogram(
+    "embedding_batch_size",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128],
+    description="Texts per model.encode call",
+)
+
+queue_wait_histogram = Histogram(
+    "embedding_queue_wait_seconds",
+    buckets=[0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0],
+    description="Time a text waited before its batch was encoded",
+)
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent single-text encode requests into one
+    model.encode(batch) call.
+
+    A batch is flushed when it reaches max_batch_size or when the oldest
+    request has waited max_wait_ms. Each caller gets a Future resolved
+    with its own vector.
+    """
+
+    def __init__(self, encode, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: "queue.Queue[tuple[str, Future, float]]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_started()
+
+        future: Future = Future()
+        self._queue.put((text, future, time.monotonic()))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _collect(self) -> list[tuple[str, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Past the deadline, still take whatever is already queued
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._process(self._collect())
+            except Exception:
+                # Never let one batch take the worker down: every later
+                # caller would wait forever
+                logger.exception("Embedding batch failed")
+
+    def _process(self, batch: list[tuple[str, Future, float]]) -> None:
+        # Callers that gave up (e.g. a client disconnect) cancelled their
+        # futures; skip them. The rest can no longer be cancelled.
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+
+        # Identical texts in one batch are encoded once
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+        batch_size_histogram.observe(len(texts))
+        for _, _, enqueued in batch:
+            queue_wait_histogram.observe(started - enqueued)
+
+        try:
+            vectors = self.encode(texts)
+        except Exception as exc:
+            for _, future, _ in batch:
+                _settle(future, exception=exc)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future, _ in batch:
+            _settle(future, result=by_text[text])
+
+
+def _settle(future: Future, result=None, exception: BaseException | None = None) -> None:
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        logger.warning("Embedding future already settled")
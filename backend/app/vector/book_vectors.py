@@ -0,0 +1,62 @@
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.book import Book
+from app.vector.backend import get_vector_backend
+from app.vector.cache import LRUCache
+
+COLLECTION_NAME = "books_clean"
+
+book_vector_cache = LRUCache(maxsize=settings.BOOK_VECTOR_CACHE_SIZE)
+
+
+def get_book_vectors(book_ids: list[str]) -> dict[str, np.ndarray]:
+    """
+    Stored vectors for the given book IDs.
+    Served from the in-process cache; misses are fetched with one
+    batched retrieve. Unknown IDs are left out of the result.
+    """
+    vectors = {}
+    missing = []
+
+    for book_id in set(book_ids):
+        cached = book_vector_cache.get(book_id)
+        if cached is None:
+            missing.append(book_id)
+        else:
+            vectors[book_id] = cached
+
+    if missing:
+        hits = get_vector_backend(COLLECTION_NAME).retrieve(
+            missing,
+            with_payload=["id"],
+            with_vectors=True,
+        )
+
+        for hit in hits:
+            if hit.vector is None:
+                continue
+
+            vector = np.array(hit.vector, dtype=np.float32)
+            vector.flags.writeable = False
+            book_vector_cache.set(hit.id, vector)
+            vectors[hit.id] = vector
+
+    return vectors
+
+
+def load_book_vectors(db: Session) -> tuple[list[str], np.ndarray]:
+    """
+    Every embedded book in the books table as (ids, matrix), with one
+    query. Vectors are decoded straight from their float32 bytes.
+    """
+    rows = db.execute(
+        select(Book.id, Book.embedding).where(Book.embedding.is_not(None))
+    ).all()
+
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+
+    return [row.id for row in rows], np.stack([row.embedding for row in rows])
@@ -0,0 +1,92 @@
+"""
+Bulk embedding for the indexing scripts.
+
+Texts are sorted by token length before batching, so each batch holds
+texts of similar length and carries little padding. With workers > 1
+encoding is spread over a sentence-transformers multi-process pool.
+
+    with BulkEncoder(workers=8) as bulk:
+        vectors = encode_with_store(texts, builder, encode=bulk.encode, model_name=MODEL_NAME)
+    print(bulk.report())
+"""
+import time
+
+import numpy as np
+
+ENCODE_BATCH_SIZE = 64
+
+
+def token_lengths(model, texts: list[str]) -> list[int]:
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return [len(t) for t in texts]
+
+    encoded = tokenizer(texts, add_special_tokens=False, truncation=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+class BulkEncoder:
+    def __init__(self, workers: int = 1, batch_size: int = ENCODE_BATCH_SIZE, model=None):
+        if model is None:
+            from app.vector.embedding import indexing_model
+            model = indexing_model()
+
+        self.model = model
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.pool = None
+
+        self.books = 0
+        self.seconds = 0.0
+
+    def __enter__(self) -> "BulkEncoder":
+        if self.workers > 1:
+            self.pool = self.model.start_multi_process_pool(["cpu"] * self.workers)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Embeddings for texts, in input order.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        started = time.perf_counter()
+
+        # Longest first, so the slowest batches start early
+        order = np.argsort(token_lengths(self.model, texts), kind="stable")[::-1]
+        ordered = [texts[i] for i in order]
+
+        if self.pool is not None:
+            # Several chunks per worker, so the pool stays balanced
+            chunk_size = max(self.batch_size, -(-len(ordered) // (self.workers * 4)))
+            encoded = self.model.encode_multi_process(
+                ordered,
+                self.pool,
+                batch_size=self.batch_size,
+                chunk_size=chunk_size,
+            )
+        else:
+            encoded = self.model.encode(ordered, batch_size=self.batch_size)
+
+        vectors = np.empty_like(np.asarray(encoded, dtype=np.float32))
+        vectors[order] = encoded
+
+        self.books += len(texts)
+        self.seconds += time.perf_counter() - started
+        return vectors
+
+    @property
+    def throughput(self) -> float:
+        return self.books / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Encoded {self.books} books in {self.seconds:.1f}s "
+            f"({self.throughput:.0f} books/sec, {self.workers} workers)"
+        )
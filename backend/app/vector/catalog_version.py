@@ -0,0 +1,53 @@
+"""
+Stamp of the indexed catalog.
+
+The indexing scripts write a new stamp whenever they change the book
+collection; anything derived from search results (precomputed
+recommendations) records the stamp it was computed against and is stale
+once it differs. Readers re-read the file only when its mtime changes.
+"""
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.core.config import settings
+
+_cached: tuple[float, str] | None = None
+_lock = threading.Lock()
+
+
+def catalog_version() -> str:
+    """
+    The current stamp, or "" before anything was indexed.
+    """
+    global _cached
+
+    path = Path(settings.CATALOG_VERSION_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return ""
+
+    cached = _cached
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        version = path.read_text(encoding="utf-8").strip()
+        _cached = (mtime, version)
+
+    return version
+
+
+def bump_catalog_version() -> str:
+    path = Path(settings.CATALOG_VERSION_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    version = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, path)
+
+    return version
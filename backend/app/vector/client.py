@@ -1,6 +1,13 @@
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.core.config import settings
 
 qdrant = QdrantClient(
-    url="http://localhost:6333",
+    url=settings.QDRANT_URL,
+    timeout=60
+)
+
+async_qdrant = AsyncQdrantClient(
+    url=settings.QDRANT_URL,
     timeout=60
 )
@@ -0,0 +1,245 @@
+"""
+Memory-mappable binary corpus: book vectors plus columnar metadata.
+
+Layout of a corpus version (the corpus directory holds versions that
+are swapped in atomically, see app.vector.snapshots):
+
+    vectors.npy     float32 (n, dim), L2-normalized, row i = book i
+    metadata.arrow  Arrow IPC file (id, title, author, description,
+                    genres, pages, cover_url), one row per book
+    id_hash.npy     sorted uint64 hashes of the book IDs
+    id_rows.npy     row number for each entry of id_hash.npy
+    meta.json       model, text builder, count, dim
+
+Everything is opened with mmap, so a process starts without parsing
+the catalog and workers share the same pages. Build one with:
+
+    python -m app.vector.corpus --source data/processed/books_clean.jsonl
+"""
+import argparse
+import hashlib
+import json
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.corpus import iter_books
+from app.vector import snapshots
+
+CHUNK_SIZE = 1024
+
+CORPUS_FILES = ["vectors.npy", "metadata.arrow", "id_hash.npy", "id_rows.npy", "meta.json"]
+
+METADATA_FIELDS = ["id", "title", "author", "description", "genres", "pages", "cover_url"]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("The binary corpus format needs pyarrow installed") from exc
+    return pa
+
+
+def id_hash(book_id: str) -> int:
+    digest = hashlib.blake2b(str(book_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class BinaryCorpus:
+    def __init__(self, path: Path):
+        pa = _pyarrow()
+        self.path = snapshots.resolve(Path(path))
+
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self.id_hash = np.load(self.path / "id_hash.npy", mmap_mode="r")
+        self.id_rows = np.load(self.path / "id_rows.npy", mmap_mode="r")
+
+        source = pa.memory_map(str(self.path / "metadata.arrow"), "r")
+        self.metadata = pa.ipc.open_file(source).read_all()
+
+    @classmethod
+    def open(cls, path: Path | None = None) -> "BinaryCorpus":
+        return cls(Path(path or settings.CORPUS_PATH))
+
+    @staticmethod
+    def exists(path: Path | None = None) -> bool:
+        return (snapshots.resolve(Path(path or settings.CORPUS_PATH)) / "meta.json").exists()
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def column(self, name: str):
+        return self.metadata.column(name)
+
+    def row_of(self, book_id: str) -> int | None:
+        h = np.uint64(id_hash(book_id))
+        i = int(np.searchsorted(self.id_hash, h))
+
+        # Walk equal hashes in case of a collision
+        while i < len(self.id_hash) and self.id_hash[i] == h:
+            row = int(self.id_rows[i])
+            if self.metadata.column("id")[row].as_py() == str(book_id):
+                return row
+            i += 1
+
+        return None
+
+    def rows_of(self, book_ids: list[str]) -> dict[str, int]:
+        rows = {}
+        for book_id in book_ids:
+            row = self.row_of(book_id)
+            if row is not None:
+                rows[book_id] = row
+        return rows
+
+    def vector(self, book_id: str) -> np.ndarray | None:
+        row = self.row_of(book_id)
+        return None if row is None else self.vectors[row]
+
+    def records(self, rows: list[int]) -> list[dict]:
+        if not rows:
+            return []
+        return self.metadata.take(rows).to_pylist()
+
+
+class PayloadView:
+    """
+    Read-only, list-like view of the metadata rows as payload dicts.
+    Column accessors avoid materializing every row.
+    """
+
+    def __init__(self, corpus: BinaryCorpus):
+        self.corpus = corpus
+
+    def __len__(self) -> int:
+        return len(self.corpus)
+
+    def __getitem__(self, row: int) -> dict:
+        return self.corpus.metadata.slice(row, 1).to_pylist()[0]
+
+    def __iter__(self):
+        for batch in self.corpus.metadata.to_batches():
+            yield from batch.to_pylist()
+
+    def values(self, key: str) -> list:
+        return self.corpus.column(key).to_pylist()
+
+    def numeric(self, key: str) -> np.ndarray:
+        return self.corpus.column(key).to_numpy(zero_copy_only=False).astype(np.float64)
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_corpus(source: Path, out_dir: Path) -> int:
+    """
+    Write a binary corpus from a .json/.jsonl catalog. Vectors are built
+    with the ingest text builder and come from the shared embedding store,
+    so they match what ingest_books indexes.
+    """
+    pa = _pyarrow()
+
+    from app.scripts.ingest_books import (
+        TEXT_BUILDER_VERSION,
+        VECTOR_SIZE,
+        build_text,
+        update_genre_vocab,
+    )
+    from app.vector.embedding import MODEL_NAME
+    from app.vector.embedding_store import encode_with_store
+
+    count = sum(1 for _ in iter_books(source))
+    vocab = update_genre_vocab(source)
+
+    # Written as a new version and swapped in at the end, so a process
+    # with the old corpus mmapped keeps a consistent view
+    version = snapshots.new_version(out_dir)
+    files = {name: version / name for name in CORPUS_FILES}
+
+    vectors = np.lib.format.open_memmap(
+        files["vectors.npy"], mode="w+", dtype=np.float32, shape=(count, VECTOR_SIZE)
+    )
+    hashes = np.empty(count, dtype=np.uint64)
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("author", pa.string()),
+        ("description", pa.string()),
+        ("genres", pa.list_(pa.string())),
+        ("genre_mask", pa.list_(pa.int64())),
+        ("pages", pa.int32()),
+        ("cover_url", pa.string()),
+    ])
+
+    books = iter_books(source)
+    row = 0
+
+    with pa.OSFile(str(files["metadata.arrow"]), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            while True:
+                chunk = list(islice(books, CHUNK_SIZE))
+                if not chunk:
+                    break
+
+                encoded = encode_with_store([build_text(b) for b in chunk], TEXT_BUILDER_VERSION)
+                norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+
+                end = row + len(chunk)
+                vectors[row:end] = encoded / norms
+                hashes[row:end] = [id_hash(b["id"]) for b in chunk]
+
+                writer.write_batch(pa.RecordBatch.from_pylist(
+                    [
+                        {
+                            **{k: b.get(k) for k in METADATA_FIELDS},
+                            "id": str(b["id"]),
+                            "genres": b.get("genres") or [],
+                            "genre_mask": vocab.mask(b.get("genres") or []),
+                        }
+                        for b in chunk
+                    ],
+                    schema=schema,
+                ))
+                row = end
+                print(f"Exported {row} / {count}")
+
+    vectors.flush()
+    del vectors
+
+    order = np.argsort(hashes, kind="stable")
+    with open(files["id_hash.npy"], "wb") as f:
+        np.save(f, hashes[order])
+    with open(files["id_rows.npy"], "wb") as f:
+        np.save(f, order.astype(np.int64))
+
+    files["meta.json"].write_text(json.dumps({
+        "model": MODEL_NAME,
+        "builder": TEXT_BUILDER_VERSION,
+        "count": count,
+        "dim": VECTOR_SIZE,
+    }), encoding="utf-8")
+
+    snapshots.publish(out_dir, version, legacy=CORPUS_FILES)
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", type=Path, default=Path(settings.BOOKS_DATA_PATH))
+    parser.add_argument("--out", type=Path, default=Path(settings.CORPUS_PATH))
+    args = parser.parse_args()
+
+    count = export_corpus(args.source, args.out)
+    print(f"Exported {count} books → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
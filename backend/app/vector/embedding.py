@@ -1,6 +1,184 @@
-from sentence_transformers import SentenceTransformer
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.vector.batcher import EmbeddingBatcher
+from app.vector.cache import LRUCache
 
-def embed_text(text: str):
-    return model.encode(text).tolist()
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def load_model(backend: str | None = None):
+    """
+    Query-time encoder for the configured backend. Both expose
+    SentenceTransformer-style encode().
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+
+    if backend == "onnx":
+        from app.vector.onnx_encoder import OnnxEncoder
+        return OnnxEncoder(Path(settings.ONNX_MODEL_DIR), threads=settings.ONNX_THREADS)
+    if backend == "torch":
+        # Imported here: importing torch alone takes seconds
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(MODEL_NAME)
+
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+# -----------------------------
+# Model registry
+# -----------------------------
+# One instance per backend per process, loaded on first use (or by
+# warmup() at startup), never at import
+_models: dict[str, object] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(backend: str | None = None):
+    backend = backend or settings.EMBEDDING_BACKEND
+    loaded = _models.get(backend)
+
+    if loaded is None:
+        with _models_lock:
+            loaded = _models.get(backend)
+            if loaded is None:
+                loaded = _models[backend] = load_model(backend)
+
+    return loaded
+
+
+def register_model(backend: str, model) -> None:
+    """
+    Install a model for a backend name, e.g. a deterministic stand-in
+    for benchmarks. Clears cached query vectors.
+    """
+    with _models_lock:
+        _models[backend] = model
+    embedding_cache.clear()
+
+
+def indexing_model():
+    """
+    The torch model, used for everything that is written to the index
+    or the embedding store, whatever the query backend.
+    """
+    return get_model("torch")
+
+
+def warmup() -> None:
+    """
+    Load the query model and run one forward pass, so the first request
+    does not pay for lazy initialization.
+    """
+    get_model().encode(["warmup"])
+
+
+def __getattr__(name: str):
+    # Backwards compatible `from app.vector.embedding import model`
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Query vectors keyed by normalized text. all-MiniLM-L6-v2 is uncased,
+# so folding case and whitespace does not change the embedding.
+embedding_cache = LRUCache(
+    maxsize=settings.EMBEDDING_CACHE_SIZE,
+    ttl=settings.EMBEDDING_CACHE_TTL_SECONDS,
+)
+register_cache("embedding", embedding_cache)
+
+# Size-limited pool for CPU inference so model passes cannot starve
+# the event loop or FastAPI's shared threadpool
+inference_executor = ThreadPoolExecutor(
+    max_workers=settings.EMBEDDING_WORKERS,
+    thread_name_prefix="embedding",
+)
+
+
+def _encode_batch(texts: list[str]) -> list[list[float]]:
+    return get_model().encode(texts, batch_size=len(texts)).tolist()
+
+
+# Coalesces concurrent single-text requests into one model.encode call
+batcher = EmbeddingBatcher(
+    _encode_batch,
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def embed_text(text):
+    if not isinstance(text, str):
+        # Batches go straight to the model
+        return get_model().encode(text).tolist()
+
+    key = normalize_text(text)
+    cached = embedding_cache.get(key)
+
+    if cached is None:
+        return _encode_and_cache(key)
+
+    return list(cached)
+
+
+def _encode_and_cache(key: str) -> list[float]:
+    if settings.EMBEDDING_BATCHING:
+        vector = batcher.submit(key).result()
+    else:
+        vector = get_model().encode(key).tolist()
+
+    embedding_cache.set(key, tuple(vector))
+    return vector
+
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """
+    Vectors for many texts: cache hits are reused and all misses are
+    encoded in a single model.encode call.
+    """
+    keys = [normalize_text(t) for t in texts]
+    vectors = {}
+
+    for key in keys:
+        if key not in vectors:
+            cached = embedding_cache.get(key)
+            vectors[key] = list(cached) if cached is not None else None
+
+    missing = [k for k, v in vectors.items() if v is None]
+    if missing:
+        encoded = get_model().encode(missing, batch_size=len(missing)).tolist()
+        for key, vector in zip(missing, encoded):
+            embedding_cache.set(key, tuple(vector))
+            vectors[key] = vector
+
+    return [vectors[k] for k in keys]
+
+
+async def embed_text_async(text: str) -> list[float]:
+    key = normalize_text(text)
+    cached = embedding_cache.get(key)
+
+    if cached is not None:
+        return list(cached)
+
+    if settings.EMBEDDING_BATCHING:
+        vector = await asyncio.wrap_future(batcher.submit(key))
+        embedding_cache.set(key, tuple(vector))
+        return vector
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, _encode_and_cache, key)
+
+
+def embedding_cache_stats() -> dict:
+    # Also exported on /metrics as cache_*{cache="embedding"}
+    return embedding_cache.stats()
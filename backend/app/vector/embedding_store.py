@@ -0,0 +1,175 @@
+"""
+Persistent, content-addressed cache of book embeddings shared by the
+indexing scripts.
+
+Vectors are keyed by (model name, text-builder version, sha256 of the
+built text), so only new or changed books are ever re-encoded. The
+store also remembers what was last upserted per collection, which
+backs the scripts' --changed-only mode.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+
+QUERY_CHUNK = 500  # stay under SQLite's bound-parameter limit
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str, payload: dict) -> str:
+    return text_hash(text + "\x00" + json.dumps(payload, sort_keys=True, ensure_ascii=False))
+
+
+class EmbeddingStore:
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    builder TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, builder, text_hash)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indexed (
+                    collection TEXT NOT NULL,
+                    book_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    PRIMARY KEY (collection, book_id)
+                )
+                """
+            )
+
+    def get_many(self, model: str, builder: str, hashes: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            for i in range(0, len(unique), QUERY_CHUNK):
+                chunk = unique[i : i + QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"""
+                    SELECT text_hash, vector FROM embeddings
+                    WHERE model = ? AND builder = ?
+                      AND text_hash IN ({",".join("?" * len(chunk))})
+                    """,
+                    [model, builder, *chunk],
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+
+        return found
+
+    def put_many(self, model: str, builder: str, items: list[tuple[str, np.ndarray]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [
+                    (model, builder, h, np.asarray(v, dtype=np.float32).tobytes())
+                    for h, v in items
+                ],
+            )
+
+    def changed(self, collection: str, items: list[tuple[str, str]]) -> set[str]:
+        """
+        Book IDs whose content hash differs from the last upsert.
+        """
+        ids = [book_id for book_id, _ in items]
+        known = {}
+
+        with self._lock:
+            for i in range(0, len(ids), QUERY_CHUNK):
+                chunk = ids[i : i + QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"""
+                    SELECT book_id, content_hash FROM indexed
+                    WHERE collection = ?
+                      AND book_id IN ({",".join("?" * len(chunk))})
+                    """,
+                    [collection, *chunk],
+                )
+                known.update(rows)
+
+        return {book_id for book_id, h in items if known.get(book_id) != h}
+
+    def mark_indexed(self, collection: str, items: list[tuple[str, str]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO indexed VALUES (?, ?, ?)",
+                [(collection, book_id, h) for book_id, h in items],
+            )
+
+    def forget_collection(self, collection: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM indexed WHERE collection = ?", [collection])
+
+
+_store: EmbeddingStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore(Path(settings.EMBEDDING_STORE_PATH))
+
+    return _store
+
+
+def encode_with_store(
+    texts: list[str],
+    builder: str,
+    encode=None,
+    model_name: str | None = None,
+    batch_size: int = 64,
+) -> np.ndarray:
+    """
+    Embeddings for texts, encoding only those not already in the store.
+    """
+    if encode is None or model_name is None:
+        from app.vector.embedding import MODEL_NAME, indexing_model
+        encode = encode or (lambda batch: indexing_model().encode(batch, batch_size=batch_size))
+        model_name = model_name or MODEL_NAME
+
+    store = get_embedding_store()
+    hashes = [text_hash(t) for t in texts]
+    cached = store.get_many(model_name, builder, hashes)
+
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached and h not in missing:
+            missing[h] = t
+
+    if missing:
+        vectors = np.asarray(encode(list(missing.values())), dtype=np.float32)
+        new = list(zip(missing.keys(), vectors))
+        store.put_many(model_name, builder, new)
+        cached.update(new)
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    return np.stack([cached[h] for h in hashes])
@@ -0,0 +1,313 @@
+"""
+Precomputed embeddings for the questionnaire vocabulary.
+
+Every questionnaire answer comes from a small, fixed list of options, so
+instead of encoding a free-text prompt per request we embed each option
+once and build the prompt vector by weighted pooling of those vectors.
+
+Build the table ahead of time with:
+
+    python -m app.vector.facets --build
+"""
+import argparse
+import asyncio
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.vector.embedding import (
+    embed_text,
+    embed_text_async,
+    embed_texts,
+    get_model,
+    inference_executor,
+)
+from app.vector.query_builder import build_query_text
+
+logger = logging.getLogger(__name__)
+
+# Options used by the app (frontend constants) and the seed catalog
+GENRES = [
+    "Romance", "Fantasy", "Mystery", "Sci-fi", "Science Fiction",
+    "Contemporary", "Historical", "Non-fiction", "Thriller", "Horror",
+]
+
+VIBES = [
+    "Cozy", "Dark", "Dreamy", "Spicy", "Cottagecore", "Melancholy",
+    "Feel-good", "Emotional & Deep", "Romantic & Swoony",
+    "Whimsical & Magical", "Slow & Contemplative", "Dark & Mysterious",
+    "Fast-Paced & Action", "Light & Funny", "Cozy & Comforting",
+    "Spooky & Eerie", "Gritty & Raw",
+]
+
+THEMES = [
+    "Healing", "Found family", "Enemies-to-lovers", "Coming-of-age",
+    "Grief", "Adventure", "Self-discovery", "Love Triangle",
+    "Self Discovery", "Betrayal", "Enemies to Lovers", "Redemption",
+    "Friendship",
+]
+
+PACES = ["Slow burn", "Fast-paced", "I like variety"]
+
+LENGTHS = [
+    "Short (<300 pages)", "Medium (300-450 pages)", "Long (450+ pages)",
+    "Short & sweet (< 300 pages)", "Epic (> 450 pages)",
+    "Length doesn't matter",
+]
+
+# Relative weight of one answer from each question when pooling
+FACET_WEIGHTS = {
+    "genres": 1.0,
+    "vibes": 1.0,
+    "themes": 1.0,
+    "pace": 0.5,
+    "length": 0.5,
+}
+
+
+def _key(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+class FacetTable:
+    def __init__(self, keys: list[str], vectors: np.ndarray):
+        self.keys = keys
+        self.vectors = vectors.astype(np.float32)
+        self.index = {k: i for i, k in enumerate(keys)}
+
+    @classmethod
+    def build(cls) -> "FacetTable":
+        keys = sorted({_key(v) for v in GENRES + VIBES + THEMES + PACES + LENGTHS})
+        vectors = get_model().encode(keys, batch_size=64)
+        return cls(keys, np.asarray(vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: Path) -> "FacetTable":
+        data = np.load(path)
+        return cls([str(k) for k in data["keys"]], data["vectors"])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, keys=np.array(self.keys), vectors=self.vectors)
+
+    def compose(
+        self,
+        genres: list[str],
+        vibes: list[str],
+        themes: list[str],
+        pace: str | None = None,
+        length: str | None = None,
+    ) -> list[float] | None:
+        """
+        Weighted mean of the facet vectors, L2-normalized.
+        Returns None if any answer is outside the known vocabulary.
+        """
+        groups = {
+            "genres": genres,
+            "vibes": vibes,
+            "themes": themes,
+            "pace": [pace] if pace else [],
+            "length": [length] if length else [],
+        }
+
+        rows = []
+        weights = []
+
+        for group, values in groups.items():
+            for value in {_key(v) for v in values if v and v.strip()}:
+                row = self.index.get(value)
+                if row is None:
+                    return None
+                rows.append(row)
+                weights.append(FACET_WEIGHTS[group])
+
+        if not rows:
+            return None
+
+        pooled = np.average(self.vectors[rows], axis=0, weights=weights)
+        norm = np.linalg.norm(pooled)
+        if norm > 0:
+            pooled = pooled / norm
+
+        return pooled.tolist()
+
+
+_table: FacetTable | None = None
+_table_lock = threading.Lock()
+
+
+def get_facet_table() -> FacetTable:
+    global _table
+
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = Path(settings.FACET_EMBEDDINGS_PATH)
+                if path.exists():
+                    _table = FacetTable.load(path)
+                else:
+                    _table = FacetTable.build()
+
+    return _table
+
+
+async def get_facet_table_async() -> FacetTable:
+    """
+    get_facet_table for the event loop: until the table is loaded (or
+    built, which runs the model), fetch it on the inference executor.
+    """
+    if _table is not None:
+        return _table
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, get_facet_table)
+
+
+def cosine(a, b) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def build_prompt_vector(
+    genres: list[str],
+    vibes: list[str],
+    themes: list[str],
+    pace: str | None = None,
+    length: str | None = None,
+) -> list[float]:
+    """
+    Prompt vector for a questionnaire submission.
+
+    QUERY_VECTOR_MODE:
+      - "facets":  pooled facet vectors, falling back to the text path
+                   for answers outside the vocabulary
+      - "text":    embed_text(query_text) as before
+      - "compare": serve the text vector and log the cosine gap
+    """
+    mode = settings.QUERY_VECTOR_MODE
+    query_text = build_query_text(genres, vibes, themes, pace, length)
+
+    if mode == "text":
+        return embed_text(query_text)
+
+    composed = get_facet_table().compose(genres, vibes, themes, pace, length)
+
+    if mode == "compare":
+        text_vector = embed_text(query_text)
+        _log_gap(composed, text_vector)
+        return text_vector
+
+    if composed is None:
+        return embed_text(query_text)
+
+    return composed
+
+
+async def build_prompt_vector_async(
+    genres: list[str],
+    vibes: list[str],
+    themes: list[str],
+    pace: str | None = None,
+    length: str | None = None,
+) -> list[float]:
+    """
+    Same as build_prompt_vector, but any model pass runs on the
+    dedicated inference executor.
+    """
+    mode = settings.QUERY_VECTOR_MODE
+    query_text = build_query_text(genres, vibes, themes, pace, length)
+
+    if mode == "text":
+        return await embed_text_async(query_text)
+
+    table = await get_facet_table_async()
+    composed = table.compose(genres, vibes, themes, pace, length)
+
+    if mode == "compare":
+        text_vector = await embed_text_async(query_text)
+        _log_gap(composed, text_vector)
+        return text_vector
+
+    if composed is None:
+        return await embed_text_async(query_text)
+
+    return composed
+
+
+def build_prompt_vectors(answers: list[tuple]) -> list[list[float]]:
+    """
+    build_prompt_vector for many submissions, each a
+    (genres, vibes, themes, pace, length) tuple. Every text that needs
+    the model is encoded in one batch.
+    """
+    mode = settings.QUERY_VECTOR_MODE
+    table = get_facet_table()
+
+    composed = [None if mode == "text" else table.compose(*a) for a in answers]
+    vectors = list(composed) if mode == "facets" else [None] * len(answers)
+
+    pending = [i for i, v in enumerate(vectors) if v is None]
+    texts = [build_query_text(*answers[i]) for i in pending]
+
+    for i, vector in zip(pending, embed_texts(texts)):
+        if mode == "compare":
+            _log_gap(composed[i], vector)
+        vectors[i] = vector
+
+    return vectors
+
+
+def _log_gap(composed, text_vector) -> None:
+    if composed is not None:
+        logger.info("facet vs text cosine gap: %.4f", 1.0 - cosine(composed, text_vector))
+
+
+def compare_samples(samples: int = 200, seed: int = 0) -> dict:
+    """
+    Cosine gap between the pooled and text paths over random questionnaires.
+    """
+    rng = np.random.default_rng(seed)
+    table = get_facet_table()
+    gaps = []
+
+    for _ in range(samples):
+        genres = list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False))
+        vibes = list(rng.choice(VIBES, size=rng.integers(1, 3), replace=False))
+        themes = list(rng.choice(THEMES, size=rng.integers(0, 3), replace=False))
+        pace = str(rng.choice(PACES))
+        length = str(rng.choice(LENGTHS))
+
+        composed = table.compose(genres, vibes, themes, pace, length)
+        text_vector = embed_text(build_query_text(genres, vibes, themes, pace, length))
+        gaps.append(1.0 - cosine(composed, text_vector))
+
+    gaps = np.array(gaps)
+    return {
+        "samples": samples,
+        "mean_gap": round(float(gaps.mean()), 4),
+        "p95_gap": round(float(np.percentile(gaps, 95)), 4),
+        "max_gap": round(float(gaps.max()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--build", action="store_true", help="write the facet table")
+    parser.add_argument("--compare", type=int, default=0, help="sample N questionnaires")
+    args = parser.parse_args()
+
+    if args.build:
+        table = FacetTable.build()
+        table.save(Path(settings.FACET_EMBEDDINGS_PATH))
+        print(f"Saved {len(table.keys)} facet vectors → {settings.FACET_EMBEDDINGS_PATH}")
+
+    if args.compare:
+        print(compare_samples(args.compare))
+
+
+if __name__ == "__main__":
+    main()
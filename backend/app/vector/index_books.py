@@ -1,63 +1,78 @@
-import json
+import argparse
+import os
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
-from qdrant_client.models import VectorParams, Distance, PointStruct
 
-from app.vector.client import qdrant
+from app.utils.corpus import iter_books
+from app.vector.backend import get_vector_backend
+from app.vector.bulk import BulkEncoder
+from app.vector.catalog_version import bump_catalog_version
+from app.vector.embedding import MODEL_NAME
+from app.vector.embedding_store import content_hash, encode_with_store, get_embedding_store
 
-DATA_PATH = Path("data/processed/books_clean.json")
+DATA_PATH = Path("data/processed/books_clean.jsonl")
 COLLECTION_NAME = "books"
+TEXT_BUILDER_VERSION = "index-v1"  # bump when build_text changes
 
 def build_text(book: dict) -> str:
     genres = ", ".join(book.get("genres", []))
     return f"{book['title']}. {book['description']} Genres: {genres}"
 
 def main():
-    print("Loading model...")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changed-only", action="store_true", help="only upsert changed books")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
 
     print("Loading books...")
-    books = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-
-    print("Creating collection...")
-    qdrant.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(
-            size=384,
-            distance=Distance.COSINE,
-        ),
-    )
-
-    points = []
-    for idx, book in enumerate(books):
-        text = build_text(book)
-        vector = model.encode(text).tolist()
-
-        points.append(
-            PointStruct(
-                id=idx,
-                vector=vector,
-                payload=book
-            )
+    books = list(iter_books(DATA_PATH))
+    texts = [build_text(book) for book in books]
+    hashes = [(book["id"], content_hash(text, book)) for book, text in zip(books, texts)]
+
+    store = get_embedding_store()
+    backend = get_vector_backend(COLLECTION_NAME)
+
+    if args.changed_only:
+        backend.ensure_collection(384)
+        changed = store.changed(COLLECTION_NAME, hashes)
+        keep = [i for i, (book_id, _) in enumerate(hashes) if book_id in changed]
+        print(f"{len(keep)} of {len(books)} books changed")
+    else:
+        print("Creating collection...")
+        backend.ensure_collection(384, recreate=True)
+        store.forget_collection(COLLECTION_NAME)
+        keep = list(range(len(books)))
+
+    print("Embedding books...")
+    with BulkEncoder(args.workers) as bulk:
+        vectors = encode_with_store(
+            [texts[i] for i in keep],
+            TEXT_BUILDER_VERSION,
+            encode=bulk.encode,
+            model_name=MODEL_NAME,
         )
+    print(bulk.report())
 
-        if idx % 500 == 0:
-            print(f"Embedded {idx} books")
+    points = [
+        (books[i]["id"], vector, books[i])
+        for i, vector in zip(keep, vectors)
+    ]
 
-    print("Uploading to Qdrant...")
+    print("Uploading vectors...")
     BATCH_SIZE = 100
 
     for i in range(0, len(points), BATCH_SIZE):
         batch = points[i : i + BATCH_SIZE]
 
-        qdrant.upsert(
-            collection_name=COLLECTION_NAME,
-            points=batch
-        )
+        backend.upsert(batch)
+        store.mark_indexed(COLLECTION_NAME, [hashes[j] for j in keep[i : i + BATCH_SIZE]])
 
         if i % 500 == 0:
             print(f"Uploaded {i}/{len(points)} vectors")
-        print("Indexing complete!")
+
+    backend.flush()
+    # Results derived from the old catalog are now stale
+    bump_catalog_version()
+    print("Indexing complete!")
 
 if __name__ == "__main__":
     main()
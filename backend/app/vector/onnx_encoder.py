@@ -0,0 +1,156 @@
+"""
+Int8 ONNX encoder for query-time embeddings on CPU.
+
+The sentence-transformers model is exported to ONNX once, then its
+weights are dynamically quantized to int8. OnnxEncoder runs the graph
+with onnxruntime and reproduces the sentence-transformers pipeline
+(mean pooling + L2 normalization), so its vectors live in the same space
+as the indexed ones and the index does not change.
+
+    python -m app.vector.onnx_encoder --export
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+
+HF_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def _onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as exc:
+        raise RuntimeError("The onnx embedding backend needs onnxruntime installed") from exc
+    return onnxruntime
+
+
+class OnnxEncoder:
+    """
+    Drop-in for SentenceTransformer.encode on the query path.
+    """
+
+    def __init__(self, model_dir: Path, threads: int = 0):
+        ort = _onnxruntime()
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(
+            str(model_dir / INT8_FILE),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _forward(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(ids)
+
+        hidden = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        vectors = np.concatenate([
+            self._forward(texts[i : i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ]).astype(np.float32)
+
+        return vectors[0] if single else vectors
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_onnx(out_dir: Path, model_name: str = HF_MODEL_NAME) -> Path:
+    """
+    Export the transformer to ONNX and write an int8 dynamically
+    quantized copy next to it. Needs torch and transformers, which
+    sentence-transformers already depends on.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    _onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["an example query"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    # torch.onnx.export wants {axis index: name}
+    axes = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[n] for n in names),
+            str(out_dir / FP32_FILE),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{n: axes for n in names},
+                "last_hidden_state": axes,
+            },
+            opset_version=14,
+        )
+
+    quantize_dynamic(
+        str(out_dir / FP32_FILE),
+        str(out_dir / INT8_FILE),
+        weight_type=QuantType.QInt8,
+    )
+    tokenizer.backend_tokenizer.save(str(out_dir / TOKENIZER_FILE))
+
+    return out_dir / INT8_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--export", action="store_true")
+    parser.add_argument("--out", type=Path, default=Path(settings.ONNX_MODEL_DIR))
+    args = parser.parse_args()
+
+    if args.export:
+        path = export_onnx(args.out)
+        print(f"Exported int8 model → {path}")
+
+
+if __name__ == "__main__":
+    main()
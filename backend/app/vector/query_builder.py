@@ -27,3 +27,28 @@ def build_user_query(preferences: dict) -> str:
         )
 
     return ". ".join(parts)
+
+
+def _normalize_facets(values: list[str]) -> list[str]:
+    return sorted({v.strip().lower() for v in values if v and v.strip()})
+
+
+def build_query_text(
+    genres: list[str],
+    vibes: list[str],
+    themes: list[str],
+    pace: str | None = None,
+    length: str | None = None,
+) -> str:
+    """
+    Canonical prompt text for the recommend endpoint.
+    Facets are lower-cased, de-duplicated and sorted so the same
+    answers always produce the same text (and the same cache key).
+    """
+    parts = (
+        _normalize_facets(genres)
+        + _normalize_facets(vibes)
+        + _normalize_facets(themes)
+        + _normalize_facets([pace, length])
+    )
+    return " ".join(parts)
@@ -1,19 +1,13 @@
-from qdrant_client import QdrantClient
-
-qdrant = QdrantClient(url="http://localhost:6333")
+from app.vector.backend import get_vector_backend
 
 COLLECTION_NAME = "books"
 
 def search_books(vector: list[float], limit: int = 10):
-    results = qdrant.search(
-        collection_name=COLLECTION_NAME,
-        query_vector=vector,
-        limit=limit
-    )
+    results = get_vector_backend(COLLECTION_NAME).search(vector, limit=limit)
 
     books = []
     for r in results:
-        payload = r.payload
+        payload = dict(r.payload)
         payload["score"] = round(r.score, 3)
         books.append(payload)
 
@@ -0,0 +1,58 @@
+"""
+Versioned data directories with an atomic swap.
+
+A writer fills a fresh version directory beside the live one, then
+replaces the CURRENT pointer file, which is a single os.replace. Readers
+resolve the pointer once when they open, so they see every file of one
+version, never a mix of old and new. The previous version is kept for
+readers still opening it; older ones are pruned.
+
+Directories written before versioning (files at the top level, no
+pointer) are read as they are.
+"""
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+POINTER = "CURRENT"
+
+
+def resolve(path: Path) -> Path:
+    """
+    The directory holding the current version's files.
+    """
+    try:
+        name = (path / POINTER).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return path
+    return path / name
+
+
+def new_version(path: Path) -> Path:
+    path.mkdir(parents=True, exist_ok=True)
+    version = path / f"v-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    version.mkdir()
+    return version
+
+
+def publish(path: Path, version: Path, legacy: list[str] = ()) -> None:
+    """
+    Make `version` current, then remove every other version but the one
+    it replaces (including unpublished leftovers of failed writes) and
+    any files of the unversioned layout.
+    """
+    previous = resolve(path)
+
+    tmp = path / f"{POINTER}.{uuid.uuid4().hex[:8]}.tmp"
+    tmp.write_text(version.name, encoding="utf-8")
+    os.replace(tmp, path / POINTER)
+
+    for name in legacy:
+        (path / name).unlink(missing_ok=True)
+
+    for old in path.glob("v-*"):
+        if old.is_dir() and old not in (version, previous):
+            # Processes with old files mmapped keep them until they close
+            shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,141 @@
+"""
+Hermetic fixtures for the benchmark suite: a deterministic embedding
+model, a synthetic catalog and signal history, SQLite, and an in-process
+vector store. Nothing touches the network.
+"""
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+VECTOR_SIZE = 384
+
+GENRES = ["Fantasy", "Romance", "Mystery", "Thriller", "Horror", "Historical",
+          "Science Fiction", "Contemporary", "Non-fiction", "Drama"]
+WORDS = ["dragon", "love", "murder", "ship", "castle", "city", "secret", "war",
+         "family", "island", "winter", "letter", "garden", "storm", "queen"]
+
+
+class HashEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer: a random unit vector
+    seeded by the text hash.
+    """
+
+    tokenizer = None
+
+    def __init__(self, dim: int = VECTOR_SIZE):
+        self.dim = dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.md5(text.lower().encode("utf-8")).digest()[:8], "little")
+        v = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return v / np.linalg.norm(v)
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        vectors = (
+            np.stack([self._vector(t) for t in texts])
+            if texts else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        return vectors[0] if single else vectors
+
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+def write_catalog(path: Path, books: int, seed: int = 0) -> Path:
+    rng = np.random.default_rng(seed)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(books):
+            words = rng.choice(WORDS, size=rng.integers(8, 40))
+            f.write(json.dumps({
+                "id": f"book-{i}",
+                "title": f"The {words[0].title()} of {words[1].title()} {i}",
+                "author": f"Author {i % 997}",
+                "description": " ".join(words),
+                "genres": list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False)),
+                "pages": int(rng.integers(80, 900)),
+                "cover_url": None,
+            }) + "\n")
+
+    return path
+
+
+def make_signals(user_id, books: int, count: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    start = datetime.utcnow() - timedelta(days=60)
+
+    return [
+        {
+            "user_id": user_id,
+            "book_id": f"book-{int(rng.integers(0, books))}",
+            "signal": "like" if rng.random() < 0.3 else "click",
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def random_request(rng: np.random.Generator, user_id=None) -> dict:
+    from app.vector.facets import LENGTHS, PACES, THEMES, VIBES
+
+    return {
+        "user_id": str(user_id or uuid.uuid4()),
+        "genres": list(rng.choice(GENRES[:6], size=rng.integers(1, 3), replace=False)),
+        "vibes": list(rng.choice(VIBES, size=rng.integers(1, 3), replace=False)),
+        "themes": list(rng.choice(THEMES, size=rng.integers(0, 2), replace=False)),
+        "pacePreference": str(rng.choice(PACES)),
+        "lengthPreference": str(rng.choice(LENGTHS)),
+        "limit": 5,
+    }
+
+
+# -----------------------------
+# Environment
+# -----------------------------
+def configure(workdir: Path) -> None:
+    """
+    Point settings at workdir, before any singleton is built.
+    """
+    from app.core.config import settings
+
+    overrides = {
+        "VECTOR_BACKEND": "numpy",
+        "NUMPY_INDEX_PATH": str(workdir / "index"),
+        "EMBEDDING_STORE_PATH": str(workdir / "embeddings.sqlite3"),
+        "FACET_EMBEDDINGS_PATH": str(workdir / "facet_embeddings.npz"),
+        "BOOKS_DATA_PATH": str(workdir / "books.jsonl"),
+        "CORPUS_PATH": str(workdir / "corpus"),
+        "CATALOG_VERSION_PATH": str(workdir / "catalog_version"),
+        "GENRE_VOCAB_PATH": str(workdir / "genre_vocab.json"),
+        # Measure the compute path, not the caches in front of it
+        "RESPONSE_CACHE_ENABLED": False,
+        "PRECOMPUTED_RECOMMENDATIONS": False,
+        "SIGNAL_BUFFERING": False,
+    }
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+
+    from app.vector.embedding import register_model
+
+    encoder = HashEncoder()
+    register_model("torch", encoder)
+    register_model(settings.EMBEDDING_BACKEND, encoder)
+
+
+def create_tables(engine) -> None:
+    """
+    The tables the benchmarks touch (user_preferences uses ARRAY, which
+    SQLite cannot create).
+    """
+    from app.db.models import PrecomputedRecommendation, UserSignal, UserTasteProfile
+
+    for model in (UserSignal, UserTasteProfile, PrecomputedRecommendation):
+        model.__table__.create(engine, checkfirst=True)
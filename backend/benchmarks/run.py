@@ -0,0 +1,252 @@
+"""
+Hermetic performance benchmarks: recommend latency under concurrency,
+taste-vector cost against history length, and ingest throughput.
+
+Runs entirely in-process (deterministic model, NumPy vector store,
+SQLite, synthetic data) and writes machine-readable JSON, so runs can
+be diffed across commits:
+
+    python -m benchmarks.run --out benchmarks/results/latest.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.fixtures import (
+    configure,
+    create_tables,
+    make_signals,
+    random_request,
+    write_catalog,
+)
+
+# app.db.session builds its engine at import; the suite uses its own
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+CONCURRENCY = [1, 4, 16]
+HISTORIES = [10, 100, 1_000, 10_000]
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        "count": int(samples.size),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+    }
+
+
+def _quiet():
+    # The scripts report progress with print
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+# -----------------------------
+# Ingest
+# -----------------------------
+def bench_ingest(workdir: Path, source: Path) -> dict:
+    from app.scripts import ingest_books
+
+    ingest_books.CHECKPOINT_PATH = workdir / ".ingest_checkpoint.json"
+
+    started = time.perf_counter()
+    with _quiet():
+        total = ingest_books.ingest(source, batch_size=512, restart=True, workers=1)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "books": total,
+        "seconds": round(elapsed, 3),
+        "books_per_sec": round(total / elapsed, 1),
+    }
+
+
+# -----------------------------
+# Recommend
+# -----------------------------
+async def _timed_recommend(session_factory, request: dict, samples: list, limiter) -> None:
+    from app.api.v1.recommend import recommend_books
+    from app.api.v1.schemas import RecommendRequest
+
+    async with limiter:
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            await recommend_books(RecommendRequest(**request), db)
+            samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+
+
+async def _recommend_round(session_factory, requests: list[dict], concurrency: int) -> dict:
+    limiter = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _timed_recommend(session_factory, r, samples, limiter) for r in requests
+    ])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        **percentiles(samples),
+        "throughput_rps": round(len(requests) / elapsed, 1),
+    }
+
+
+def bench_recommend(session_factory, books: int, requests: int, concurrency: list[int]) -> list[dict]:
+    from app.services.signal_buffer import write_signals
+
+    rng = np.random.default_rng(1)
+
+    # A share of returning users with taste profiles
+    users = [uuid.uuid4() for _ in range(50)]
+    db = session_factory()
+    for i, user in enumerate(users):
+        write_signals(db, make_signals(user, books, 20, seed=i))
+    db.commit()
+    db.close()
+
+    def batch(n: int) -> list[dict]:
+        return [
+            random_request(rng, users[i % len(users)] if i % 2 else None)
+            for i in range(n)
+        ]
+
+    # Warm up lazy state: facet table, book store, index load
+    asyncio.run(_recommend_round(session_factory, batch(10), 1))
+
+    return [
+        asyncio.run(_recommend_round(session_factory, batch(requests), c))
+        for c in concurrency
+    ]
+
+
+# -----------------------------
+# Taste vector
+# -----------------------------
+def _time_calls(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_taste_vector(session_factory, books: int, histories: list[int], repeat: int = 50) -> list[dict]:
+    from sqlalchemy import insert
+
+    from app.db.models.user_signal import UserSignal
+    from app.services.taste_profile import apply_signals, get_taste_vector
+    from app.services.user_profile import build_user_taste_vector
+    from app.vector.book_vectors import book_vector_cache
+
+    results = []
+    db = session_factory()
+
+    for history in histories:
+        user = uuid.uuid4()
+        events = make_signals(user, books, history, seed=history)
+        db.execute(insert(UserSignal), events)
+        apply_signals(db, events)
+        db.commit()
+
+        book_vector_cache.clear()
+        cold = _time_calls(lambda: build_user_taste_vector(db, user), 1)[0]
+
+        results.append({
+            "history": history,
+            "signals_query_cold_ms": round(cold, 3),
+            "signals_query": percentiles(_time_calls(lambda: build_user_taste_vector(db, user), repeat)),
+            "profile_read": percentiles(_time_calls(lambda: get_taste_vector(db, user), repeat)),
+        })
+
+    db.close()
+    return results
+
+
+# -----------------------------
+# Suite
+# -----------------------------
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    workdir: Path,
+    books: int = 5_000,
+    requests: int = 200,
+    concurrency: list[int] = CONCURRENCY,
+    histories: list[int] = HISTORIES,
+) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    workdir.mkdir(parents=True, exist_ok=True)
+    configure(workdir)
+
+    engine = create_engine(f"sqlite:///{workdir / 'bench.sqlite3'}")
+    create_tables(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    source = write_catalog(workdir / "books.jsonl", books)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "books": books,
+            "requests_per_level": requests,
+        },
+        "ingest": bench_ingest(workdir, source),
+        "recommend": bench_recommend(session_factory, books, requests, concurrency),
+        "taste_vector": bench_taste_vector(session_factory, books, histories),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", type=Path, default=Path("benchmarks/results/latest.json"))
+    parser.add_argument("--workdir", type=Path, default=None)
+    parser.add_argument("--books", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY)
+    parser.add_argument("--histories", type=int, nargs="+", default=HISTORIES)
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="bench-"))
+    results = run_suite(workdir, args.books, args.requests, args.concurrency, args.histories)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    print(json.dumps(results, indent=2))
+    print(f"Results → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
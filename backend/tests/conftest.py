@@ -0,0 +1,77 @@
+"""
+Hermetic test environment, shared with the benchmark suite: the
+deterministic HashEncoder, a synthetic catalog in the NumPy vector
+store, and a fresh SQLite database per test.
+"""
+import contextlib
+import io
+import os
+import uuid
+
+# app.db.session builds its engine at import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fixtures import configure, create_tables, make_signals, write_catalog
+
+BOOKS = 200
+
+
+@pytest.fixture(scope="session")
+def catalog(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("catalog")
+    configure(workdir)
+
+    from app.scripts import ingest_books
+
+    ingest_books.CHECKPOINT_PATH = workdir / ".ingest_checkpoint.json"
+    source = write_catalog(workdir / "books.jsonl", BOOKS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest_books.ingest(source, batch_size=64, restart=True, workers=1)
+
+    return workdir
+
+
+@pytest.fixture
+def session_factory(catalog, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.sqlite3'}")
+    create_tables(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    from fastapi.testclient import TestClient
+
+    from app.db.session import get_db
+    from app.main import app
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def returning_user(session_factory):
+    """
+    A user with a signal history and a taste profile.
+    """
+    from app.services.signal_buffer import write_signals
+
+    user_id = uuid.uuid4()
+    db = session_factory()
+    write_signals(db, make_signals(user_id, BOOKS, 20))
+    db.commit()
+    db.close()
+    return user_id
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.vector.batcher import EmbeddingBatcher
+
+
+def gated_encoder():
+    """
+    An encoder that blocks until released, recording each batch.
+    """
+    release = threading.Event()
+    batches = []
+
+    def encode(texts):
+        release.wait(5)
+        batches.append(list(texts))
+        return [np.full(3, len(t), dtype=np.float32) for t in texts]
+
+    return encode, release, batches
+
+
+def test_identical_texts_share_one_encode():
+    encode, release, batches = gated_encoder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=8, max_wait_ms=50)
+
+    futures = [batcher.submit(t) for t in ["a", "bb", "a"]]
+    release.set()
+
+    assert [f.result(5)[0] for f in futures] == [1, 2, 1]
+    assert sorted(sum(batches, [])) == ["a", "bb"]
+
+
+def test_encode_errors_reach_every_caller():
+    def encode(texts):
+        raise RuntimeError("model failed")
+
+    batcher = EmbeddingBatcher(encode, max_wait_ms=1)
+    future = batcher.submit("a")
+
+    assert isinstance(future.exception(5), RuntimeError)
+    # The worker survives for the next caller
+    assert isinstance(batcher.submit("b").exception(5), RuntimeError)
+
+
+def test_cancelled_callers_do_not_stop_the_worker():
+    encode, release, _ = gated_encoder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=1, max_wait_ms=1)
+
+    async def scenario():
+        # First caller occupies the worker; the next two give up while
+        # queued (e.g. client disconnects)
+        busy = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("busy")))
+        gone = [asyncio.ensure_future(asyncio.wrap_future(batcher.submit(t))) for t in ["x", "y"]]
+        await asyncio.sleep(0.01)
+        for task in gone:
+            task.cancel()
+        # Let the cancellation reach the queued futures
+        await asyncio.sleep(0.01)
+
+        release.set()
+        await busy
+        return await asyncio.wait_for(asyncio.wrap_future(batcher.submit("next")), 2)
+
+    assert asyncio.run(scenario())[0] == 4
+
+
+def test_concurrent_texts_are_encoded_in_bounded_batches():
+    encode, release, batches = gated_encoder()
+    batcher = EmbeddingBatcher(encode, max_batch_size=3, max_wait_ms=50)
+
+    futures = [batcher.submit(str(i)) for i in range(7)]
+    release.set()
+
+    assert [f.result(5)[0] for f in futures] == [1] * 7
+    assert max(len(b) for b in batches) <= 3
+    assert sorted(sum(batches, [])) == [str(i) for i in range(7)]
+
+
+def test_dead_worker_is_restarted():
+    batcher = EmbeddingBatcher(lambda texts: [np.ones(3) for _ in texts], max_wait_ms=1)
+    batcher.submit("a").result(5)
+
+    # Simulate a worker that died (e.g. after an interpreter-level error)
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    batcher._thread = dead
+
+    assert batcher.submit("b").result(5).tolist() == [1.0, 1.0, 1.0]
@@ -0,0 +1,28 @@
+from benchmarks.run import bench_recommend, bench_taste_vector, percentiles
+from tests.conftest import BOOKS
+
+
+def test_percentiles():
+    stats = percentiles([float(i) for i in range(1, 101)])
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 50.5
+    assert stats["p99_ms"] == 99.01
+    assert stats["mean_ms"] == 50.5
+
+
+def test_recommend_benchmark_reports_each_concurrency(session_factory):
+    results = bench_recommend(session_factory, BOOKS, requests=8, concurrency=[1, 4])
+
+    assert [r["concurrency"] for r in results] == [1, 4]
+    for r in results:
+        assert r["count"] == 8
+        assert 0 < r["p50_ms"] <= r["p99_ms"]
+        assert r["throughput_rps"] > 0
+
+
+def test_taste_vector_benchmark_reports_each_history(session_factory):
+    results = bench_taste_vector(session_factory, BOOKS, histories=[5, 50], repeat=3)
+
+    assert [r["history"] for r in results] == [5, 50]
+    assert all(r["profile_read"]["count"] == 3 for r in results)
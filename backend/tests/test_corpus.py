@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.book_store import BookStore
+from app.vector import snapshots
+from app.vector.backend import NumpyBackend
+from benchmarks.fixtures import write_catalog
+
+pytest.importorskip("pyarrow")
+
+from app.vector.corpus import CORPUS_FILES, BinaryCorpus, export_corpus  # noqa: E402
+
+
+@pytest.fixture
+def export(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "GENRE_VOCAB_PATH", str(tmp_path / "genre_vocab.json"))
+
+    def run(books: int, seed: int = 0):
+        source = write_catalog(tmp_path / f"books-{books}-{seed}.jsonl", books, seed=seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_corpus(source, tmp_path / "corpus")
+        return source
+
+    return run
+
+
+def test_exported_corpus_loads(export, tmp_path):
+    source = export(50)
+    books = [json.loads(line) for line in source.read_text(encoding="utf-8").splitlines()]
+
+    corpus = BinaryCorpus.open(tmp_path / "corpus")
+
+    assert len(corpus) == corpus.meta["count"] == 50
+    assert np.allclose(np.linalg.norm(corpus.vectors, axis=1), 1.0)
+    assert corpus.row_of("book-17") == 17
+    assert corpus.row_of("missing") is None
+    assert corpus.records([3])[0]["title"] == books[3]["title"]
+
+    store = BookStore(corpus=corpus)
+    assert store.get_many(["book-5"], collection="unused")["book-5"].genres == tuple(books[5]["genres"])
+
+    backend = NumpyBackend(tmp_path / "corpus")
+    hit = backend.search(corpus.vectors[9], limit=1)[0]
+    assert hit.id == "book-9"
+    assert hit.payload["genre_mask"]
+
+
+def test_reexport_swaps_every_file_at_once(export, tmp_path):
+    export(30)
+    old = BinaryCorpus.open(tmp_path / "corpus")
+    old_vector = np.array(old.vectors[0])
+
+    export(40, seed=1)
+    new = BinaryCorpus.open(tmp_path / "corpus")
+
+    assert len(new) == new.meta["count"] == 40
+    assert new.path != old.path
+    # A reader opened before the swap keeps a consistent old version
+    assert len(old) == old.meta["count"] == 30
+    assert np.allclose(old.vectors[0], old_vector)
+    assert len(old.column("id")) == 30
+
+    export(20, seed=2)
+    versions = sorted(p.name for p in (tmp_path / "corpus").glob("v-*"))
+    # The current version and the one it replaced
+    assert len(versions) == 2
+    assert not old.path.exists()
+
+
+def test_unversioned_corpus_is_still_read(export, tmp_path):
+    export(10)
+    corpus_dir = tmp_path / "corpus"
+    version = snapshots.resolve(corpus_dir)
+
+    # The layout before versioning: files at the top level
+    for name in CORPUS_FILES:
+        (version / name).rename(corpus_dir / name)
+    (corpus_dir / snapshots.POINTER).unlink()
+
+    assert BinaryCorpus.exists(corpus_dir)
+    assert len(BinaryCorpus.open(corpus_dir)) == 10
+
+    export(12, seed=1)
+    assert len(BinaryCorpus.open(corpus_dir)) == 12
+    assert not (corpus_dir / "meta.json").exists()
+
+
+def test_numpy_flush_publishes_a_new_version(tmp_path):
+    backend = NumpyBackend(tmp_path / "index")
+    backend.ensure_collection(4)
+    backend.upsert([("a", np.eye(4)[0], {"id": "a"})])
+    backend.flush()
+    first = snapshots.resolve(tmp_path / "index")
+
+    backend.upsert([("b", np.eye(4)[1], {"id": "b"})])
+    backend.flush()
+
+    assert snapshots.resolve(tmp_path / "index") != first
+    assert NumpyBackend(tmp_path / "index").ids == ["a", "b"]
@@ -0,0 +1,66 @@
+import pytest
+
+from app.core.config import settings
+from benchmarks.fixtures import HashEncoder
+
+
+class CountingEncoder(HashEncoder):
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def encode(self, texts, batch_size: int = 32, **kwargs):
+        self.encoded.extend([texts] if isinstance(texts, str) else texts)
+        return super().encode(texts, batch_size=batch_size, **kwargs)
+
+
+@pytest.fixture
+def encoder(catalog, monkeypatch):
+    from app.vector import embedding
+
+    monkeypatch.setattr(settings, "EMBEDDING_BATCHING", False)
+    counting = CountingEncoder()
+    embedding.register_model(settings.EMBEDDING_BACKEND, counting)
+    yield counting
+    embedding.register_model(settings.EMBEDDING_BACKEND, HashEncoder())
+
+
+def test_repeated_text_is_encoded_once(encoder):
+    from app.vector.embedding import embed_text, embed_texts, embedding_cache
+
+    hits = embedding_cache.hits
+
+    first = embed_text("Cozy  Fantasy")
+    assert embed_text("cozy fantasy") == first
+    assert embed_texts(["COZY FANTASY", "dark thriller"])[0] == first
+
+    assert encoder.encoded == ["cozy fantasy", "dark thriller"]
+    assert embedding_cache.hits - hits == 2
+
+
+def test_least_recently_used_text_is_evicted(encoder, monkeypatch):
+    from app.vector import embedding
+    from app.vector.cache import LRUCache
+
+    monkeypatch.setattr(embedding, "embedding_cache", LRUCache(maxsize=2))
+
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        embedding.embed_text(text)
+
+    # "b" was the least recently used when "c" arrived
+    assert encoder.encoded == ["a", "b", "c", "b"]
+    assert embedding.embedding_cache.evictions == 2
+
+
+def test_metrics_exposes_cache_counters(client, encoder):
+    from app.vector.embedding import embed_text, embedding_cache
+
+    embed_text("metrics probe")
+    embed_text("metrics probe")
+
+    text = client.get("/metrics").text
+
+    assert "# TYPE cache_hits_total counter" in text
+    assert f'cache_hits_total{{cache="embedding"}} {embedding_cache.hits}' in text
+    assert f'cache_misses_total{{cache="embedding"}} {embedding_cache.misses}' in text
+    assert 'cache_evictions_total{cache="embedding"}' in text
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.vector.facets import FACET_WEIGHTS, FacetTable
+
+
+@pytest.fixture
+def table():
+    keys = ["cozy", "fantasy", "healing", "slow burn"]
+    return FacetTable(keys, np.eye(4, dtype=np.float32))
+
+
+def test_compose_is_the_weighted_normalized_mean(table):
+    vector = np.array(table.compose(["Fantasy"], [" cozy "], [], pace="Slow burn"))
+
+    expected = np.array([FACET_WEIGHTS["vibes"], FACET_WEIGHTS["genres"], 0.0, FACET_WEIGHTS["pace"]])
+    expected /= np.linalg.norm(expected)
+    assert np.allclose(vector, expected)
+
+
+def test_compose_counts_repeated_answers_once(table):
+    once = table.compose(["Fantasy"], ["Cozy"], [])
+    twice = table.compose(["Fantasy", "fantasy "], ["Cozy"], [""])
+
+    assert np.allclose(once, twice)
+
+
+def test_compose_rejects_unknown_answers(table):
+    assert table.compose(["Fantasy"], ["Not a vibe"], []) is None
+    assert table.compose([], [], []) is None
+
+
+def test_save_and_load_round_trip(table, tmp_path):
+    path = tmp_path / "facets.npz"
+    table.save(path)
+
+    loaded = FacetTable.load(path)
+
+    assert loaded.keys == table.keys
+    assert loaded.compose(["Fantasy"], ["Cozy"], ["Healing"]) == table.compose(["Fantasy"], ["Cozy"], ["Healing"])
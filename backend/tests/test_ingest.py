@@ -0,0 +1,85 @@
+import contextlib
+import io
+
+import pytest
+
+from app.core.config import settings
+from app.scripts import ingest_books
+from app.vector.backend import NumpyBackend
+from benchmarks.fixtures import write_catalog
+
+BATCH = 16
+
+
+@pytest.fixture
+def index(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_books, "CHECKPOINT_PATH", tmp_path / "checkpoint.json")
+    monkeypatch.setattr(ingest_books, "CHECKPOINT_EVERY", 2)
+    monkeypatch.setattr(settings, "GENRE_VOCAB_PATH", str(tmp_path / "genre_vocab.json"))
+    monkeypatch.setattr(settings, "CATALOG_VERSION_PATH", str(tmp_path / "catalog_version"))
+
+    backend = NumpyBackend(tmp_path / "index")
+    monkeypatch.setattr(ingest_books, "get_vector_backend", lambda name: backend)
+    return backend
+
+
+def ingest(source, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ingest_books.ingest(source, batch_size=BATCH, workers=1, **kwargs)
+
+
+def recording(read_chunks, starts):
+    def wrapper(source, start, batch_size):
+        starts.append(start)
+        return read_chunks(source, start, batch_size)
+    return wrapper
+
+
+def test_interrupted_ingest_resumes_from_the_checkpoint(index, tmp_path, monkeypatch):
+    source = write_catalog(tmp_path / "books.jsonl", 10 * BATCH)
+
+    upsert = index.upsert
+    calls = []
+
+    def failing_upsert(points):
+        calls.append(len(points))
+        if len(calls) == 5:
+            raise RuntimeError("store went away")
+        upsert(points)
+
+    monkeypatch.setattr(index, "upsert", failing_upsert)
+    with pytest.raises(RuntimeError):
+        ingest(source)
+
+    done = ingest_books.load_checkpoint(source)
+    assert done == 4 * BATCH
+    # Everything the checkpoint covers was flushed with it
+    assert len(NumpyBackend(tmp_path / "index").ids) >= done
+
+    monkeypatch.setattr(index, "upsert", upsert)
+    resumed = []
+    monkeypatch.setattr(ingest_books, "read_chunks", recording(ingest_books.read_chunks, resumed))
+
+    assert ingest(source) == 10 * BATCH
+    assert resumed == [done]
+    assert not ingest_books.CHECKPOINT_PATH.exists()
+
+    reloaded = NumpyBackend(tmp_path / "index")
+    assert sorted(reloaded.ids) == sorted(f"book-{i}" for i in range(10 * BATCH))
+
+
+def test_checkpoint_is_ignored_for_another_source(index, tmp_path):
+    first = write_catalog(tmp_path / "first.jsonl", BATCH)
+    ingest_books.save_checkpoint(first, BATCH)
+
+    assert ingest_books.load_checkpoint(first) == BATCH
+    assert ingest_books.load_checkpoint(tmp_path / "second.jsonl") == 0
+
+
+def test_restart_ignores_the_checkpoint(index, tmp_path):
+    source = write_catalog(tmp_path / "books.jsonl", 3 * BATCH)
+    ingest_books.save_checkpoint(source, 2 * BATCH)
+
+    assert ingest(source, restart=True) == 3 * BATCH
+    assert len(index.ids) == 3 * BATCH
+
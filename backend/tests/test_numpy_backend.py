@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+
+from app.vector.backend import NumpyBackend, PayloadFilter, RangeCondition
+
+
+def unit(i: int, dim: int = 8) -> np.ndarray:
+    v = np.zeros(dim, dtype=np.float32)
+    v[i % dim] = 1.0
+    return v
+
+
+def test_new_rows_map_to_their_vectors(tmp_path):
+    backend = NumpyBackend(tmp_path / "index")
+    backend.ensure_collection(8)
+
+    backend.upsert([(f"b{i}", unit(i), {"id": f"b{i}", "pages": 100 * i}) for i in range(3)])
+    backend.upsert([("b1", unit(5), {"id": "b1", "pages": 100}), ("b9", unit(7), {"id": "b9", "pages": 900})])
+
+    assert backend.search(unit(7), limit=1)[0].id == "b9"
+    assert backend.search(unit(5), limit=1)[0].id == "b1"
+    assert np.allclose(backend.retrieve(["b9"], with_vectors=True)[0].vector, unit(7))
+
+    backend.flush()
+    reloaded = NumpyBackend(tmp_path / "index")
+    assert reloaded.search(unit(7), limit=1)[0].id == "b9"
+
+
+def test_filters_apply_to_search():
+    backend = NumpyBackend()
+    backend.ensure_collection(8)
+    backend.upsert([(f"b{i}", unit(0), {"id": f"b{i}", "pages": 100 * i}) for i in range(8)])
+
+    hits = backend.search(
+        unit(0),
+        limit=10,
+        query_filter=PayloadFilter(ranges={"pages": RangeCondition(gte=300, lte=500)}),
+    )
+
+    assert sorted(h.id for h in hits) == ["b3", "b4", "b5"]
+
+
+def test_searches_during_upserts_see_consistent_rows():
+    backend = NumpyBackend()
+    backend.ensure_collection(8)
+    backend.upsert([("seed", unit(0), {"id": "seed", "pages": 1})])
+    errors = []
+
+    def write():
+        for i in range(300):
+            backend.upsert([(f"b{i}", unit(i), {"id": f"b{i}", "pages": i})])
+
+    def read():
+        try:
+            for _ in range(300):
+                for hit in backend.search(unit(3), limit=5, query_filter=PayloadFilter(
+                    ranges={"pages": RangeCondition(gte=0)},
+                )):
+                    assert hit.payload["id"] == hit.id
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(backend.ids) == 301
+
+
+def test_chunked_upserts_grow_the_matrix_geometrically():
+    backend = NumpyBackend()
+    backend.ensure_collection(8)
+    buffers = set()
+
+    for chunk in range(50):
+        backend.upsert([
+            (f"b{chunk}-{i}", unit(i), {"id": f"b{chunk}-{i}"}) for i in range(64)
+        ])
+        buffers.add(id(backend._matrix))
+
+    assert backend.vectors.shape == (50 * 64, 8)
+    # 3200 rows from a 1024-row start: 1024, 2048, 4096
+    assert len(buffers) == 3
+
+
+def test_snapshots_do_not_see_later_rows():
+    backend = NumpyBackend()
+    backend.ensure_collection(8)
+    backend.upsert([("a", unit(0), {"id": "a"})])
+
+    view, _ = backend._view()
+    backend.upsert([("b", unit(1), {"id": "b"})])
+
+    assert view.size == len(view.vectors) == 1
+    assert backend.retrieve(["b"])[0].id == "b"
+    assert [h.id for h in backend._top_k(view, view.vectors @ unit(1), None, 5, True)] == ["a"]
+
+
+def test_loaded_index_accepts_upserts(tmp_path):
+    backend = NumpyBackend(tmp_path / "index")
+    backend.ensure_collection(8)
+    backend.upsert([(f"b{i}", unit(i), {"id": f"b{i}"}) for i in range(4)])
+    backend.flush()
+
+    # vectors.npy is mmapped read-only
+    reloaded = NumpyBackend(tmp_path / "index")
+    reloaded.upsert([("b1", unit(6), {"id": "b1"}), ("b4", unit(4), {"id": "b4"})])
+
+    assert reloaded.search(unit(6), limit=1)[0].id == "b1"
+    assert reloaded.search(unit(4), limit=1)[0].id == "b4"
+    assert NumpyBackend(tmp_path / "index").search(unit(1), limit=1)[0].id == "b1"
+
+
+def test_match_any_uses_a_cached_index(monkeypatch):
+    backend = NumpyBackend()
+    backend.ensure_collection(8)
+    backend.upsert([
+        (f"b{i}", unit(i), {"id": f"b{i}", "genres": [["Fantasy"], ["Romance", "Fantasy"], [], ["Mystery"]][i % 4], "lang": "en" if i % 2 else "fr"})
+        for i in range(8)
+    ])
+    scans = []
+    values = backend._values
+    monkeypatch.setattr(backend, "_values", lambda key: scans.append(key) or values(key))
+
+    def ids(query_filter):
+        return sorted(h.id for h in backend.search(unit(0), limit=10, query_filter=query_filter))
+
+    assert ids(PayloadFilter(match_any={"genres": ["Fantasy"]})) == ["b0", "b1", "b4", "b5"]
+    assert ids(PayloadFilter(match_any={"genres": ["Romance", "Mystery", "Horror"]})) == ["b1", "b3", "b5", "b7"]
+    assert ids(PayloadFilter(match_any={"genres": ["Fantasy"], "lang": ["en"]})) == ["b1", "b5"]
+    assert scans == ["genres", "lang"]
+
+    # A write starts a new snapshot
+    backend.upsert([("b9", unit(1), {"id": "b9", "genres": ["Horror"]})])
+    assert ids(PayloadFilter(match_any={"genres": ["Horror"]})) == ["b9"]
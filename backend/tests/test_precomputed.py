@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.api.v1.schemas import RecommendRequest
+from app.core.config import settings
+from app.services.precomputed import get_precomputed, store_precomputed
+from benchmarks.fixtures import make_signals, random_request
+from tests.conftest import BOOKS
+
+
+@pytest.fixture(autouse=True)
+def precomputed(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PRECOMPUTED_RECOMMENDATIONS", True)
+
+
+def test_precomputed_rows_expire_with_the_catalog(session_factory, returning_user, monkeypatch):
+    from app.services import recommender
+    from app.vector.catalog_version import bump_catalog_version
+
+    payload = RecommendRequest(**random_request(np.random.default_rng(3), returning_user))
+
+    async def visit():
+        db = session_factory()
+        try:
+            results = await recommender.recommend_stored(db, payload)
+            await asyncio.gather(*recommender._pending_stores)
+            return results
+        finally:
+            db.close()
+
+    computed = asyncio.run(visit())
+    stored, _ = get_precomputed(session_factory(), payload)
+    assert [b.id for b in stored] == [b.id for b in computed]
+
+    bump_catalog_version()
+    stored, _ = get_precomputed(session_factory(), payload)
+    assert stored is None
+
+
+def test_precomputed_rows_expire_after_the_ttl(session_factory, returning_user, monkeypatch):
+    from app.db.models import PrecomputedRecommendation
+
+    payload = RecommendRequest(**random_request(np.random.default_rng(5), returning_user))
+    db = session_factory()
+    _, version = get_precomputed(db, payload)
+    store_precomputed(db, payload, [], version)
+
+    assert get_precomputed(db, payload)[0] == []
+
+    row = db.get(PrecomputedRecommendation, returning_user)
+    row.computed_at = datetime.utcnow() - timedelta(seconds=settings.PRECOMPUTED_TTL_SECONDS + 60)
+    db.commit()
+
+    assert get_precomputed(db, payload) == (None, version)
+    db.close()
+
+
+def test_new_signals_make_the_row_stale(session_factory, returning_user):
+    from app.services.signal_buffer import write_signals
+
+    payload = RecommendRequest(**random_request(np.random.default_rng(6), returning_user))
+    db = session_factory()
+    _, version = get_precomputed(db, payload)
+    store_precomputed(db, payload, [], version)
+
+    write_signals(db, make_signals(returning_user, BOOKS, 1, seed=9))
+    db.commit()
+
+    stored, new_version = get_precomputed(db, payload)
+    assert stored is None
+    assert new_version == version + 1
+    db.close()
@@ -0,0 +1,77 @@
+import csv
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from app.scripts import process_books
+
+ROWS = [
+    {"book_id": "a", "title": " Dune (Deluxe Edition)", "authors": "Frank Herbert", "description": "Sand.",
+     "categories": "science fiction/ adventure", "thumbnail": "http://img/a", "language": "en",
+     "page_count": "250.5", "average_rating": "4.5", "ratings_count": "1200"},
+    {"book_id": "b", "title": "No Description", "authors": "", "description": "",
+     "categories": "", "thumbnail": "", "language": "en",
+     "page_count": "100", "average_rating": "", "ratings_count": ""},
+    {"book_id": "c", "title": "Emma", "authors": "Jane Austen", "description": "Matchmaking.",
+     "categories": "Romance", "thumbnail": "", "language": "en",
+     "page_count": "not a number", "average_rating": "", "ratings_count": "7.0"},
+    {"book_id": "d", "title": "Dracula", "authors": "Bram Stoker", "description": "Teeth.",
+     "categories": "", "thumbnail": " ", "language": "en",
+     "page_count": "", "average_rating": "3", "ratings_count": "1e30"},
+]
+
+
+@pytest.fixture
+def raw(tmp_path):
+    path = tmp_path / "raw.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(ROWS[0]))
+        writer.writeheader()
+        writer.writerows(ROWS)
+    return path
+
+
+def run(monkeypatch, raw, out, fmt):
+    monkeypatch.setattr(sys, "argv", [
+        "process_books", "--input", str(raw), "--output", str(out),
+        "--format", fmt, "--chunk-size", "2", "--workers", "1",
+    ])
+    process_books.main()
+
+
+def test_to_int_truncates_and_drops_bad_values():
+    values = pd.Series(["250.5", "12", None, "x", "-3.7", "1e30"], dtype="string")
+
+    assert process_books.to_int(values).tolist() == [250, 12, pd.NA, pd.NA, -3, pd.NA]
+
+
+def test_jsonl_output_has_one_book_per_line(monkeypatch, raw, tmp_path):
+    out = tmp_path / "books.jsonl"
+    run(monkeypatch, raw, out, "jsonl")
+
+    lines = out.read_text(encoding="utf-8").split("\n")
+    assert lines[-1] == ""
+    books = [json.loads(line) for line in lines[:-1]]
+
+    assert [b["id"] for b in books] == ["a", "c", "d"]
+    assert books[0]["title"] == "Dune"
+    assert books[0]["genres"] == ["Science Fiction", "Adventure"]
+    assert [b["pages"] for b in books] == [250, None, None]
+    assert [b["rating_count"] for b in books] == [1200, 7, None]
+    # Fallback covers continue across chunks
+    assert books[0]["cover_url"] == "http://img/a"
+    assert [b["cover_url"] for b in books[1:]] == process_books.FALLBACK_COVERS[:2]
+
+
+def test_json_and_parquet_outputs_match_jsonl(monkeypatch, raw, tmp_path):
+    run(monkeypatch, raw, tmp_path / "books.jsonl", "jsonl")
+    expected = [json.loads(line) for line in (tmp_path / "books.jsonl").read_text(encoding="utf-8").splitlines()]
+
+    run(monkeypatch, raw, tmp_path / "books.json", "json")
+    assert json.loads((tmp_path / "books.json").read_text(encoding="utf-8")) == expected
+
+    pytest.importorskip("pyarrow")
+    run(monkeypatch, raw, tmp_path / "books.parquet", "parquet")
+    assert pd.read_parquet(tmp_path / "books.parquet")["id"].tolist() == ["a", "c", "d"]
@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.vector.backend import PayloadFilter, QdrantBackend, RangeCondition, point_id_for
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+
+def unit(i: int, dim: int = 8) -> list[float]:
+    v = np.zeros(dim, dtype=np.float32)
+    v[i % dim] = 1.0
+    return v.tolist()
+
+
+def points(n: int = 6) -> list[tuple]:
+    return [
+        (f"b{i}", unit(i), {"id": f"b{i}", "genres": ["Fantasy" if i % 2 else "Romance"], "pages": 100 * i})
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def backend():
+    backend = QdrantBackend("books", client=qdrant_client.QdrantClient(":memory:"))
+    backend.ensure_collection(8)
+    backend.upsert(points())
+    return backend
+
+
+def test_search_returns_nearest_books(backend):
+    hits = backend.search(np.array(unit(3)), limit=2, with_payload=["id", "pages"])
+
+    assert hits[0].id == "b3"
+    assert hits[0].score == pytest.approx(1.0)
+    assert hits[0].payload == {"id": "b3", "pages": 300}
+
+
+def test_search_applies_filters(backend):
+    hits = backend.search(
+        unit(0),
+        limit=10,
+        query_filter=PayloadFilter(
+            match_any={"genres": ["Fantasy"]},
+            ranges={"pages": RangeCondition(gte=200)},
+        ),
+    )
+
+    assert sorted(h.id for h in hits) == ["b3", "b5"]
+
+
+def test_retrieve_and_filter(backend):
+    hit = backend.retrieve(["b4"], with_vectors=True)[0]
+    assert hit.id == "b4"
+    assert np.allclose(hit.vector, unit(4))
+
+    hits = backend.filter(PayloadFilter(ranges={"pages": RangeCondition(lt=200)}))
+    assert sorted(h.id for h in hits) == ["b0", "b1"]
+
+
+def test_search_async():
+    from qdrant_client import models
+
+    async def scenario():
+        client = qdrant_client.AsyncQdrantClient(":memory:")
+        await client.create_collection(
+            "books", vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE),
+        )
+        await client.upsert("books", points=[
+            models.PointStruct(id=point_id_for(book_id), vector=vector, payload=payload)
+            for book_id, vector, payload in points()
+        ])
+
+        backend = QdrantBackend("books", client=object(), async_client=client)
+        return await backend.search_async(unit(5), limit=1)
+
+    assert [h.id for h in asyncio.run(scenario())] == ["b5"]
+
+
+def test_search_batch_answers_each_query_in_order(backend):
+    from app.vector.backend import SearchQuery
+
+    results = backend.search_batch([
+        SearchQuery(unit(2), limit=1),
+        SearchQuery(unit(0), limit=3, query_filter=PayloadFilter(match_any={"genres": ["Fantasy"]}), with_payload=["id"]),
+        SearchQuery(unit(4), limit=1, query_filter=PayloadFilter(ranges={"pages": RangeCondition(gt=1000)})),
+    ])
+
+    assert [h.id for h in results[0]] == ["b2"]
+    assert sorted(h.id for h in results[1]) == ["b1", "b3", "b5"]
+    assert results[1][0].payload.keys() == {"id"}
+    assert results[2] == []
+    assert backend.search_batch([]) == []
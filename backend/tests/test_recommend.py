@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from benchmarks.fixtures import random_request
+
+
+@pytest.fixture(autouse=True)
+def uncached(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "PRECOMPUTED_RECOMMENDATIONS", False)
+
+
+def test_recommend_returns_ranked_books(client, returning_user):
+    request = random_request(np.random.default_rng(0), returning_user)
+
+    response = client.post("/api/v1/recommend", json=request)
+
+    assert response.status_code == 200
+    books = response.json()
+    assert len(books) == request["limit"]
+    scores = [b["score"] for b in books]
+    assert scores == sorted(scores, reverse=True)
+
+    timing = response.headers["server-timing"]
+    for stage in ("prompt_embedding", "taste_vector", "vector_search", "rerank", "serialization"):
+        assert stage in timing
+
+
+def test_batch_matches_single(client, returning_user):
+    rng = np.random.default_rng(1)
+    requests = [random_request(rng, returning_user if i % 2 else None) for i in range(4)]
+
+    batch = client.post("/api/v1/recommend/batch", json={"requests": requests})
+    assert batch.status_code == 200
+
+    for request, results in zip(requests, batch.json()):
+        single = client.post("/api/v1/recommend", json=request).json()
+        assert [b["id"] for b in results] == [b["id"] for b in single]
+
+
+def test_metrics_exposes_stage_histograms(client):
+    client.post("/api/v1/recommend", json=random_request(np.random.default_rng(2)))
+
+    text = client.get("/metrics").text
+
+    assert "# TYPE recommend_stage_seconds histogram" in text
+    assert 'recommend_stage_seconds_count{stage="vector_search"}' in text
+
+
+def test_blocking_stages_run_off_the_event_loop(session_factory, monkeypatch):
+    import asyncio
+    import threading
+
+    from app.api.v1.schemas import RecommendRequest
+    from app.services import recommender
+    from app.services.book_store import get_book_store
+    from app.vector.backend import get_vector_backend
+
+    backend = get_vector_backend(recommender.COLLECTION_NAME)
+    store = get_book_store()
+    threads = {}
+
+    def record(name, fn):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.current_thread()
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(backend, "search", record("search", backend.search))
+    monkeypatch.setattr(store, "get_many", record("hydrate", store.get_many))
+
+    payload = RecommendRequest(**random_request(np.random.default_rng(4)))
+
+    async def run():
+        db = session_factory()
+        try:
+            return await recommender.recommend_async(db, payload)
+        finally:
+            db.close()
+
+    assert asyncio.run(run())
+    assert threads["search"] is not threading.main_thread()
+    assert threads["hydrate"] is not threading.main_thread()
@@ -0,0 +1,154 @@
+import asyncio
+import uuid
+
+import numpy as np
+
+from app.api.v1.schemas import RecommendRequest
+from app.core.config import settings
+from app.services.response_cache import (
+    InProcessCacheBackend,
+    InProcessSignalVersions,
+    ResponseCache,
+)
+from benchmarks.fixtures import random_request
+
+
+def payload(user_id=None) -> RecommendRequest:
+    return RecommendRequest(**random_request(np.random.default_rng(0), user_id or uuid.uuid4()))
+
+
+def new_cache() -> ResponseCache:
+    return ResponseCache(InProcessCacheBackend(maxsize=100, ttl=None), InProcessSignalVersions())
+
+
+def test_concurrent_misses_compute_once():
+    cache = new_cache()
+    request = payload()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def scenario():
+        return await asyncio.gather(*[cache.get_or_compute(request, compute) for _ in range(5)])
+
+    assert asyncio.run(scenario()) == [["result"]] * 5
+    assert len(calls) == 1
+
+
+def test_followers_survive_the_first_caller_disconnecting():
+    cache = new_cache()
+    request = payload()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_compute(request, compute))
+        follower = asyncio.ensure_future(cache.get_or_compute(request, compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == ["result"]
+
+
+def test_signal_bump_invalidates():
+    cache = new_cache()
+    request = payload()
+    results = iter([["old"], ["new"]])
+
+    async def compute():
+        return next(results)
+
+    async def get():
+        return await cache.get_or_compute(request, compute)
+
+    assert asyncio.run(get()) == ["old"]
+    assert asyncio.run(get()) == ["old"]
+
+    cache.versions.bump([request.user_id])
+    assert asyncio.run(get()) == ["new"]
+
+
+def test_versions_are_bounded_and_never_go_back():
+    versions = InProcessSignalVersions(maxsize=2)
+
+    versions.bump(["a"])
+    seen = versions.get("a")
+    versions.bump(["b", "c"])
+
+    assert len(versions) == 2
+    # Evicted: still at least the version it had
+    assert versions.get("a") >= seen
+
+
+def test_shared_computation_outlives_the_callers_session(session_factory, monkeypatch):
+    from app.services.recommender import recommend_cached
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "PRECOMPUTED_RECOMMENDATIONS", False)
+    request = payload()
+
+    def closed(*args, **kwargs):
+        raise AssertionError("used a request session after its request ended")
+
+    async def scenario():
+        first_db, follower_db = session_factory(), session_factory()
+        first = asyncio.ensure_future(recommend_cached(first_db, request))
+        follower = asyncio.ensure_future(recommend_cached(follower_db, request))
+        # Both callers are now waiting on the computation the first started
+        await asyncio.sleep(0)
+
+        # The first client disconnects; get_db closes its session
+        first.cancel()
+        first_db.close()
+        first_db.execute = first_db.get = first_db.scalars = closed
+
+        try:
+            return await follower
+        finally:
+            follower_db.close()
+
+    assert len(asyncio.run(scenario())) == request.limit
+
+
+def test_flushed_signals_invalidate_cached_responses(session_factory, monkeypatch):
+    from app.services import recommender
+    from app.services.response_cache import response_cache
+    from app.services.signal_buffer import SignalBuffer
+    from benchmarks.fixtures import make_signals
+    from tests.conftest import BOOKS
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "PRECOMPUTED_RECOMMENDATIONS", False)
+    request = payload()
+    computed = []
+
+    async def recommend_stored(db, payload):
+        computed.append(payload.user_id)
+        return [len(computed)]
+
+    monkeypatch.setattr(recommender, "recommend_stored", recommend_stored)
+
+    def get():
+        db = session_factory()
+        try:
+            return asyncio.run(recommender.recommend_cached(db, request))
+        finally:
+            db.close()
+
+    assert get() == get() == [1]
+
+    buffer = SignalBuffer(session_factory, flush_interval_ms=10_000)
+    buffer.submit([
+        {k: v for k, v in e.items() if k != "created_at"}
+        for e in make_signals(request.user_id, BOOKS, 3)
+    ])
+    buffer.close()
+
+    assert get() == [2]
+    assert response_cache.versions.get(request.user_id) > 0
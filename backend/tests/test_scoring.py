@@ -0,0 +1,66 @@
+import numpy as np
+
+from app.services.scoring import GenreVocab, genre_overlap_scores, page_counts, score_candidates
+
+
+def test_genre_masks_count_shared_genres():
+    vocab = GenreVocab(["Fantasy", "Romance", "Mystery"])
+    payloads = [
+        {"genre_mask": vocab.mask(["Fantasy", "Romance"])},
+        {"genre_mask": vocab.mask(["Mystery"])},
+        {"genre_mask": vocab.mask([])},
+    ]
+
+    scores = genre_overlap_scores([" fantasy", "ROMANCE", "Not A Genre"], payloads, vocab)
+
+    assert np.allclose(scores, [2 / 3, 0.0, 0.0])
+
+
+def test_unknown_user_genres_do_not_grow_the_vocab():
+    vocab = GenreVocab(["Fantasy"])
+
+    genre_overlap_scores(["Brand New Genre"], [{"genres": ["Fantasy"]}], vocab)
+
+    assert vocab.genres == ["fantasy"]
+
+
+def test_payloads_without_masks_are_encoded_from_genres():
+    vocab = GenreVocab(["Fantasy", "Romance"])
+    payloads = [{"genres": ["Romance"]}, {"genre_mask": vocab.mask(["Fantasy"])}, {}]
+
+    scores = genre_overlap_scores(["romance", "fantasy"], payloads, vocab)
+
+    assert scores.tolist() == [0.5, 0.5, 0.0]
+
+
+def test_masks_span_several_words(tmp_path):
+    genres = [f"genre {i}" for i in range(150)]
+    vocab = GenreVocab(genres)
+    assert vocab.words == 3
+
+    vocab.save(tmp_path / "vocab.json")
+    loaded = GenreVocab.load(tmp_path / "vocab.json")
+    payloads = [{"genre_mask": loaded.mask(["genre 0", "genre 70", "genre 149"])}]
+
+    assert genre_overlap_scores(["genre 70", "genre 149"], payloads, loaded).tolist() == [1.0]
+
+
+def test_extending_the_vocab_keeps_old_masks_valid():
+    vocab = GenreVocab(["Fantasy"])
+    old = {"genre_mask": vocab.mask(["Fantasy"])}
+
+    vocab.extend(f"genre {i}" for i in range(100))
+    new = {"genre_mask": vocab.mask(["genre 99"])}
+
+    assert genre_overlap_scores(["fantasy", "genre 99"], [old, new], vocab).tolist() == [0.5, 0.5]
+
+
+def test_page_scores_ignore_missing_pages():
+    assert np.isnan(page_counts([{}, {"pages": None}, {"pages": "n/a"}])).all()
+
+    final, _, p_scores = score_candidates(
+        [], "Short (<300 pages)", [0.5, 0.5, 0.5], [{"pages": 120}, {"pages": 600}, {}],
+    )
+
+    assert p_scores.tolist() == [1.0, 0.0, 0.0]
+    assert final[0] > final[1] == final[2]
@@ -0,0 +1,123 @@
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import UserSignal
+from app.services.signal_buffer import BufferFull, SignalBuffer
+from benchmarks.fixtures import make_signals
+from tests.conftest import BOOKS
+
+
+def events(count: int) -> list[dict]:
+    user_id = uuid.uuid4()
+    return [
+        {k: v for k, v in e.items() if k != "created_at"}
+        for e in make_signals(user_id, BOOKS, count)
+    ]
+
+
+def stored(session_factory) -> int:
+    db = session_factory()
+    try:
+        return db.scalar(select(func.count()).select_from(UserSignal))
+    finally:
+        db.close()
+
+
+def failing(session_factory, failures: list[int]):
+    """
+    session_factory whose first failures[0] sessions fail to write.
+    """
+    def factory():
+        db = session_factory()
+        if failures[0] > 0:
+            failures[0] -= 1
+
+            def execute(*args, **kwargs):
+                raise RuntimeError("database unavailable")
+
+            db.execute = execute
+        return db
+
+    return factory
+
+
+def test_close_writes_everything(session_factory):
+    buffer = SignalBuffer(session_factory, flush_size=4, flush_interval_ms=10_000)
+
+    buffer.submit(events(10))
+    buffer.close()
+
+    assert stored(session_factory) == 10
+    assert buffer.stats()["written"] == 10
+
+
+def test_full_buffer_rejects_the_whole_submit(session_factory):
+    buffer = SignalBuffer(session_factory, max_size=5, flush_size=100, flush_interval_ms=10_000)
+
+    buffer.submit(events(4))
+    with pytest.raises(BufferFull):
+        buffer.submit(events(2))
+
+    buffer.close()
+    assert stored(session_factory) == 4
+
+
+def test_failed_flush_is_retried(session_factory):
+    buffer = SignalBuffer(
+        failing(session_factory, [2]),
+        flush_size=100,
+        flush_interval_ms=10_000,
+        max_retries=3,
+        retry_backoff_ms=1,
+    )
+
+    buffer.submit(events(5))
+    buffer.close()
+
+    assert stored(session_factory) == 5
+    assert buffer.stats()["dropped"] == 0
+
+
+def test_batch_is_dropped_after_retries(session_factory):
+    buffer = SignalBuffer(
+        failing(session_factory, [100]),
+        flush_size=100,
+        flush_interval_ms=10_000,
+        max_retries=2,
+        retry_backoff_ms=1,
+    )
+
+    buffer.submit(events(5))
+    buffer.close()
+
+    stats = buffer.stats()
+    assert stats["dropped"] == 5
+    assert stats["failed"] == 15  # three attempts
+    assert stored(session_factory) == 0
+
+
+def test_worker_retries_in_the_background(session_factory):
+    import time
+
+    buffer = SignalBuffer(
+        failing(session_factory, [1]),
+        flush_size=5,
+        flush_interval_ms=5,
+        max_retries=3,
+        retry_backoff_ms=5,
+    )
+
+    buffer.submit(events(5))
+    # Accepted while the first batch waits for its retry
+    buffer.submit(events(3))
+
+    deadline = time.monotonic() + 5
+    while buffer.stats()["written"] < 8 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = buffer.stats()
+    assert (stats["written"], stats["failed"], stats["retrying"]) == (8, 5, 0)
+    assert stored(session_factory) == 8
+    buffer.close()
@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.models.user_signal import ensure_signal_index
+
+
+def test_index_is_added_to_an_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.sqlite3'}")
+    with engine.begin() as conn:
+        # user_signals as created before the index was declared
+        conn.execute(text(
+            "CREATE TABLE user_signals (id CHAR(32), created_at DATETIME, "
+            "user_id CHAR(32) NOT NULL, book_id VARCHAR NOT NULL, signal VARCHAR NOT NULL, "
+            "PRIMARY KEY (id, created_at))"
+        ))
+
+    ensure_signal_index(engine)
+    ensure_signal_index(engine)
+
+    indexes = {i["name"]: i["column_names"] for i in inspect(engine).get_indexes("user_signals")}
+    assert indexes == {"ix_user_signals_user_id_created_at": ["user_id", "created_at"]}
+    engine.dispose()
@@ -0,0 +1,37 @@
+import uuid
+
+from benchmarks.fixtures import make_signals
+from tests.conftest import BOOKS
+
+
+def test_racing_first_signals_create_the_profile_once(session_factory, monkeypatch):
+    from app.db.models import UserTasteProfile
+    from app.services import taste_profile
+
+    user_id = uuid.uuid4()
+
+    # Another transaction inserts the row between our locking read
+    # (which found nothing) and our insert
+    select_for_update = taste_profile._select_for_update
+    calls = []
+
+    def racing_select(db, user_ids):
+        calls.append(user_ids)
+        if len(calls) == 1:
+            other = session_factory()
+            taste_profile.apply_signals(other, make_signals(user_id, BOOKS, 1, seed=1))
+            other.commit()
+            other.close()
+            return {}
+        return select_for_update(db, user_ids)
+
+    monkeypatch.setattr(taste_profile, "_select_for_update", racing_select)
+
+    db = session_factory()
+    profiles = taste_profile.apply_signals(db, make_signals(user_id, BOOKS, 5, seed=2))
+    db.commit()
+
+    assert profiles[user_id].version == 6
+    assert db.query(UserTasteProfile).count() == 1
+    assert len(taste_profile.get_taste_vector(db, user_id)) == 384
+    db.close()